@@ -1,37 +1,56 @@
-import discord, re, traceback
+import discord, re, asyncio, traceback
+from typing import TYPE_CHECKING
+from collections import Counter
 from discord import commands
 from discord.ext.commands import Cog
 from datetime import datetime
 from BackgroundPingu.bot.main import BackgroundPingu
-from BackgroundPingu.core import parser, issues
+from BackgroundPingu.core import parser
+from BackgroundPingu.core.scheduler import RateLimited
+from BackgroundPingu.core.pages import Page
 from BackgroundPingu.bot.ui import views
 
+if TYPE_CHECKING:
+    from BackgroundPingu.core.issues import IssueBuilder
+
+LINK_PATTERN = re.compile(r"https:\/\/paste\.ee\/p\/\w+|https:\/\/mclo\.gs\/\w+|https?:\/\/[\w\-_\/.]+\.(?:txt|log)")
+# every link_pattern match contains one of these
+LINK_HINTS = ["paste.ee/p/", "mclo.gs/", ".txt", ".log"]
+# latest.log, hs_err_pid1234.log, crash-2023-01-01_00.00.00-client.txt, launcher logs and pasted message.txt files,
+# gzipped logs and zips or tarballs of the logs and crash-reports folders
+ATTACHMENT_PATTERN = re.compile(r".+\.(?:(?:log|txt)(?:\.\d+)?(?:\.gz)?|zip|tar\.gz|tgz)", re.IGNORECASE)
+ATTACHMENT_TYPES = ["text/", "application/octet-stream", "application/json", "application/gzip", "application/x-gzip", "application/zip", "application/x-zip-compressed", "application/x-tar", "application/x-compressed-tar"]
+# bigger attachments are streamed and truncated instead of being read into memory at once, bigger archives are skipped
+MAX_READ_SIZE = parser.MAX_LOG_SIZE
+MAX_ATTACHMENT_SIZE = 4 * parser.MAX_LOG_SIZE
+
+def is_log_attachment(attachment: discord.Attachment) -> bool:
+    if attachment.size == 0 or attachment.size > (MAX_READ_SIZE if attachment.filename.lower().endswith(parser.ARCHIVE_EXTENSIONS) else MAX_ATTACHMENT_SIZE): return False
+    if not attachment.content_type is None and not attachment.content_type.startswith(tuple(ATTACHMENT_TYPES)): return False
+    return not ATTACHMENT_PATTERN.fullmatch(attachment.filename) is None
+
 class Core(Cog):
     def __init__(self, bot: BackgroundPingu) -> None:
         super().__init__()
         self.bot = bot
+        # how many messages on_message saw, and at which stage it stopped looking at them
+        self.message_stages = Counter()
     
     async def check_log(self, msg: discord.Message, include_content=False):
         found_result = False
         result = {
             "text": None,
             "embed": None,
-            "view": None
+            "view": None,
+            "page": None
         }
-        link_pattern = r"https:\/\/paste\.ee\/p\/\w+|https:\/\/mclo\.gs\/\w+|https?:\/\/[\w\-_\/.]+\.(?:txt|log)"
-        matches = re.findall(link_pattern, msg.content)
-        if len(msg.attachments) > 0:
-            for attachment in msg.attachments:
-                matches.append(attachment.url)
-        for match in matches:
-            log = parser.Log.from_link(match)
+        for source, get_log in enumerate(self.get_log_sources(msg)):
+            log = await get_log()
             if not log is None:
                 try:
-                    results = issues.IssueChecker(self.bot, log).check()
+                    results = await self.bot.workers.check(log)
                     if results.has_values():
-                        messages = results.build()
-                        result["embed"] = await self.build_embed(results, messages, msg)
-                        result["view"] = views.Paginator(messages, results, msg)
+                        await self.add_pages(result, results, msg, source)
                         found_result = True
                 except Exception as e:
                     error = "".join(traceback.format_exception(e))
@@ -39,14 +58,41 @@ class Core(Cog):
                     found_result = True
             if found_result: break
         if not found_result and include_content:
-            results = issues.IssueChecker(self.bot, parser.Log(msg.content)).check()
-            if results.has_values():
-                messages = results.build()
-                result["embed"] = await self.build_embed(results, messages, msg)
-                result["view"] = views.Paginator(messages, results, msg)
+            results = await self.bot.workers.check(parser.Log(msg.content))
+            if results.has_values(): await self.add_pages(result, results, msg, -1)
         return result
 
-    async def build_embed(self, results: issues.IssueBuilder, messages: list[str], msg: discord.Message):
+    async def add_pages(self, result: dict, results: "IssueBuilder", msg: discord.Message, source: int):
+        # only the results are kept for the buttons, the log is fetched again if it gets re-uploaded
+        messages = results.build()
+        result["embed"] = await self.build_embed(results, messages, msg)
+        result["page"] = Page(msg.channel.id, msg.id, msg.author.id, source, results.to_dict())
+        result["view"] = views.Paginator(result["page"], messages)
+
+    def save_page(self, reply: discord.Message, result: dict):
+        if not result["page"] is None: self.bot.pages.put(reply.id, result["page"])
+
+    def get_log_sources(self, msg: discord.Message) -> list:
+        return [lambda match=match: parser.Log.from_link(match, self.bot.session) for match in LINK_PATTERN.findall(msg.content)] \
+            + [lambda attachment=attachment: self.read_attachment(attachment) for attachment in filter(is_log_attachment, msg.attachments)]
+
+    async def get_log(self, msg: discord.Message, source: int) -> parser.Log:
+        if source == -1: return parser.Log(msg.content)
+        sources = self.get_log_sources(msg)
+        if source >= len(sources): return None
+        return await sources[source]()
+
+    async def read_attachment(self, attachment: discord.Attachment) -> parser.Log:
+        if attachment.size > MAX_READ_SIZE: return await parser.Log.from_url(attachment.url, self.bot.session)
+        encoding = "utf-8"
+        if not attachment.content_type is None and "charset=" in attachment.content_type:
+            encoding = attachment.content_type.split("charset=")[1].split(";")[0].strip()
+        try: data = await attachment.read()
+        except discord.HTTPException: return None
+        if attachment.filename.lower().endswith(parser.ARCHIVE_EXTENSIONS): return await parser.Log.from_archive(data, attachment.filename)
+        return await parser.Log.from_bytes(data, encoding)
+
+    async def build_embed(self, results: "IssueBuilder", messages: list[str], msg: discord.Message):
         embed = discord.Embed(
             title=f"{results.amount} Issue{'s' if results.amount > 1 else ''} Found:",
             description=messages[0],
@@ -60,18 +106,75 @@ class Core(Cog):
     def should_reply(self, result: dict):
         return not result["text"] is None or (not result["embed"] is None and not result["view"] is None)
 
+    def has_log(self, msg: discord.Message) -> bool:
+        self.message_stages["messages"] += 1
+        if msg.author.bot:
+            self.message_stages["bot"] += 1
+            return False
+        if not any(is_log_attachment(attachment) for attachment in msg.attachments):
+            if not "http" in msg.content or not any(hint in msg.content for hint in LINK_HINTS):
+                self.message_stages["no_link_hint"] += 1
+                return False
+            if LINK_PATTERN.search(msg.content) is None:
+                self.message_stages["no_link"] += 1
+                return False
+        self.message_stages["checked"] += 1
+        return True
+
+    async def schedule(self, msg: discord.Message, user: discord.User, include_content=False) -> dict:
+        """Runs check_log through the scheduler and counts why if the job was dropped. Raises QueueFull or RateLimited, returns None if the message was deleted."""
+        try:
+            return await self.bot.scheduler.submit(
+                lambda: self.check_log(msg, include_content),
+                msg.guild.id if not msg.guild is None else 0,
+                user.id,
+                msg.id,
+                priority=include_content
+            )
+        except asyncio.QueueFull:
+            self.message_stages["queue_full"] += 1
+            raise
+        except RateLimited:
+            self.message_stages["rate_limited"] += 1
+            raise
+        except asyncio.CancelledError:
+            if self.bot.is_closed(): raise
+            self.message_stages["deleted"] += 1
+        return None
+
     @Cog.listener()
     async def on_message(self, msg: discord.Message):
-        result = await self.check_log(msg)
-        if self.should_reply(result):
-            return await msg.reply(content=result["text"], embed=result["embed"], view=result["view"])
+        if not self.has_log(msg): return
+        try: result = await self.schedule(msg, msg.author)
+        except (asyncio.QueueFull, RateLimited): return
+        if not result is None and self.should_reply(result):
+            reply = await msg.reply(content=result["text"], embed=result["embed"], view=result["view"])
+            self.save_page(reply, result)
+
+    @Cog.listener()
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
+        self.bot.scheduler.cancel(payload.message_id)
+
+    @Cog.listener()
+    async def on_raw_bulk_message_delete(self, payload: discord.RawBulkMessageDeleteEvent):
+        for message_id in payload.message_ids: self.bot.scheduler.cancel(message_id)
     
     @commands.message_command(name="Check Log")
     async def check_log_cmd(self, ctx: discord.ApplicationContext, msg: discord.Message):
-        result = await self.check_log(msg, include_content=True)
+        # waiting for a slot and checking can take longer than discord waits for a response,
+        # errors answer the deferred response only the user sees and results are replies everyone sees
+        await ctx.defer(ephemeral=True)
+        try: result = await self.schedule(msg, ctx.author, include_content=True)
+        except asyncio.QueueFull:
+            return await ctx.respond(":x: **Too many logs are being checked right now, try again in a minute.**", ephemeral=True)
+        except RateLimited:
+            return await ctx.respond(":x: **You're checking too many logs, try again in a minute.**", ephemeral=True)
+        if result is None: return await ctx.delete()
         if self.should_reply(result):
-            return await ctx.response.send_message(content=result["text"], embed=result["embed"], view=result["view"])
-        return await ctx.response.send_message(":x: **No log or no issues found in this message.**", ephemeral=True)
+            reply = await msg.reply(content=result["text"], embed=result["embed"], view=result["view"])
+            self.save_page(reply, result)
+            return await ctx.delete()
+        return await ctx.respond(":x: **No log or no issues found in this message.**", ephemeral=True)
 
 def setup(bot: BackgroundPingu):
     bot.add_cog(Core(bot))
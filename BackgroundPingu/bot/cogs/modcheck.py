@@ -1,7 +1,6 @@
 from discord.ext import tasks
 from discord.ext.commands import Cog
 from BackgroundPingu.bot.main import BackgroundPingu
-from BackgroundPingu.data import mods_getter
 
 class ModCheck(Cog):
     def __init__(self, bot: BackgroundPingu) -> None:
@@ -15,7 +14,7 @@ class ModCheck(Cog):
 
     @tasks.loop(minutes=15)
     async def mod_updater(self):
-        mods_getter.get_mods(start=False)
+        await self.bot.refresh_data()
 
 def setup(bot: BackgroundPingu):
     bot.add_cog(ModCheck(bot))
@@ -0,0 +1,53 @@
+import discord
+from discord import commands
+from discord.ext.commands import Cog, is_owner
+from BackgroundPingu.bot.main import BackgroundPingu
+
+class Owner(Cog):
+    def __init__(self, bot: BackgroundPingu) -> None:
+        super().__init__()
+        self.bot = bot
+
+    @commands.slash_command(name="stats", description="Shows analysis statistics.")
+    @is_owner()
+    async def stats(self, ctx: discord.ApplicationContext):
+        cache = self.bot.workers.cache
+        lookups = cache.hits + cache.misses
+        text = "**Result cache**\n" \
+            f"- Entries: `{len(cache)}/{cache.size}`\n" \
+            f"- Hits: `{cache.hits}`, misses: `{cache.misses}`" + (f" (`{cache.hits / lookups:.0%}` hit rate)" if lookups > 0 else "") + "\n" \
+            f"- Data version: `{self.bot.data_version[:12]}`"
+        scheduler = self.bot.scheduler
+        depths = sorted(scheduler.guild_depths().values(), reverse=True)
+        text += "\n**Queue**\n" \
+            f"- Depth: `{scheduler.depth}/{scheduler.size}` over `{len(depths)}` guilds" + (f" (busiest `{depths[0]}`)" if len(depths) > 0 else "") + f", running: `{scheduler.running}/{scheduler.concurrency}`\n" \
+            f"- Wait p50: `{scheduler.wait_percentile(50) * 1000:.0f}ms`, p99: `{scheduler.wait_percentile(99) * 1000:.0f}ms`\n" \
+            f"- Queue full: `{scheduler.rejected}`, rate limited: `{scheduler.rate_limited}`, cancelled: `{scheduler.cancelled}`"
+        text += "\n**Startup**\n- " + ", ".join(f"{step}: `{seconds * 1000:.0f}ms`" for step, seconds in self.bot.startup.items())
+        core = self.bot.get_cog("Core")
+        if not core is None:
+            stages = core.message_stages
+            text += "\n**Messages**\n" \
+                f"- Seen: `{stages['messages']}`\n" \
+                f"- From bots: `{stages['bot']}`, no link hint: `{stages['no_link_hint']}`, no link: `{stages['no_link']}`\n" \
+                f"- Checked: `{stages['checked']}`"
+        return await ctx.respond(text, ephemeral=True)
+
+    @commands.slash_command(name="rules", description="Shows the checker rules that take the longest.")
+    @is_owner()
+    async def rules(
+        self,
+        ctx: discord.ApplicationContext,
+        sort: discord.Option(str, "What to sort by", choices=["total", "p50", "p99"], default="total"),
+        amount: discord.Option(int, "How many rules to show", min_value=1, max_value=20, default=10)
+    ):
+        timings = self.bot.workers.timings
+        if timings.checks == 0: return await ctx.respond("No logs were checked yet.", ephemeral=True)
+        lines = [f"{'rule':<34} {'runs':>6} {'skips':>6} {'total ms':>9} {'p50 ms':>7} {'p99 ms':>7}"]
+        for summary in timings.slowest(amount, sort):
+            lines.append(f"{summary['name']:<34} {summary['count']:>6} {summary['skipped']:>6} {summary['total'] * 1000:>9.1f} {summary['p50'] * 1000:>7.3f} {summary['p99'] * 1000:>7.3f}")
+        text = f"**Slowest rules** over `{timings.checks}` checks, by `{sort}`\n```\n" + "\n".join(lines) + "\n```"
+        return await ctx.respond(text, ephemeral=True)
+
+def setup(bot: BackgroundPingu):
+    bot.add_cog(Owner(bot))
@@ -1,21 +1,34 @@
-import discord, os, json
+import discord, os, time, asyncio, aiohttp
 from datetime import datetime
 from discord import AutoShardedBot as asb
+from BackgroundPingu.core import http, workers, scheduler, upload, pages, profiling
+from BackgroundPingu.data import compiled, issues_sorter
+from BackgroundPingu.bot.ui import views
 
 class BackgroundPingu(asb):
     def __init__(self):
         self.start_time = datetime.utcnow()
+        # seconds from the start of __init__ until each step of booting finished
+        self.startup: dict[str, float] = {}
+        self._started = time.perf_counter()
 
-        with open("./BackgroundPingu/data/issues.json", "r") as f:
-            self.strings = json.load(f)
-        with open("./BackgroundPingu/data/mods.json", "r") as f:
-            self.mods = json.load(f)
+        self.data_version = None
+        self.load_data()
+        self.startup["data"] = time.perf_counter() - self._started
 
         self.cog_blacklist = []
         self.cog_folder_blacklist = ["__pycache__"]
+        # cogs without commands that nothing needs before the bot is ready, loaded in on_ready
+        self.cog_deferred = ["modcheck.py"]
+        self.cog_times: dict[str, float] = {}
         self.path = "./BackgroundPingu/bot/cogs"
 
         self.color = 0xFFFFFF
+        self.session: aiohttp.ClientSession = None
+        self.workers = workers.AnalysisPool(self)
+        self.scheduler = scheduler.Scheduler(self.workers.workers * 2)
+        self.uploader = upload.Uploader(self)
+        self.pages = pages.PageStore()
 
         super().__init__(
             intents=discord.Intents.all(),
@@ -27,30 +40,78 @@ class BackgroundPingu(asb):
 
         print("\nLoading cogs..."),
         self.load_cogs()
+        self.startup["cogs"] = time.perf_counter() - self._started
 
-    def load_cogs(self, folder=None):
+    def load_cogs(self, folder=None, deferred=False):
         if not folder is None: self.path = os.path.join(self.path, folder)
         formatted_path = self.path.strip("./").replace("/", ".").replace("\\", ".")
 
         for file in os.listdir(self.path):
             if not os.path.isdir(os.path.join(self.path, file)):
-                if not file in self.cog_blacklist:
+                if not file in self.cog_blacklist and (file in self.cog_deferred) == deferred:
                     try:
+                        start = time.perf_counter()
                         self.load_extension(f"{formatted_path}.{file[:-3]}")
+                        self.cog_times[file] = time.perf_counter() - start
                         print(f"  Loaded '{file}'")
                     except Exception as e: print(e)
             else:
                 if not file in self.cog_folder_blacklist:
-                    self.load_cogs(file)
+                    self.load_cogs(file, deferred)
     
+    def load_data(self) -> bool:
+        data_version, strings, mods = compiled.read_files()
+        if data_version == self.data_version: return False
+        self.strings, self.mods, self.catalogue = compiled.get(data_version, strings, mods)
+        self.data_version = data_version
+        return True
+
+    def reload_data(self):
+        if self.load_data():
+            self.workers.reload()
+            print("Reloaded issues and mods.")
+
+    async def refresh_data(self):
+        """Fetches mods and sorts issues, ModCheck runs this once the bot is ready and then every 15 minutes. The bot keeps the data it has if this fails."""
+        # requests is only needed here, so it isn't imported while booting
+        from BackgroundPingu.data import mods_getter
+        try:
+            await asyncio.to_thread(mods_getter.get_mods, False)
+            await asyncio.to_thread(issues_sorter.sort)
+        except Exception as e: print(f"Couldn't refresh data: {e}")
+        self.reload_data()
+
+    async def start(self, *args, **kwargs):
+        self.session = http.create_session()
+        self.workers.start()
+        self.scheduler.start()
+        # handles the buttons of every result, including ones sent before this start
+        self.add_view(views.Paginator())
+        return await super().start(*args, **kwargs)
+
+    async def close(self):
+        self.scheduler.stop()
+        if not self.session is None: await self.session.close()
+        self.workers.shutdown()
+        self.pages.close()
+        return await super().close()
+
     async def on_connect(self):
+        self.startup.setdefault("connect", time.perf_counter() - self._started)
         print("Registering commands...")
         await self.sync_commands()
         await self.register_commands()
         print("\nConnected")
 
     async def on_ready(self):
-        return print(f"Ready, took {(datetime.utcnow() - self.start_time).seconds} seconds.")
+        if "ready" in self.startup: return print("Ready.")
+        self.startup["ready"] = time.perf_counter() - self._started
+        print("Ready, took " + ", ".join(f"{step} {seconds * 1000:.0f}ms" for step, seconds in self.startup.items()) + ".")
+        self.load_cogs(deferred=True)
+        if not profiling.profiler is None:
+            print(f"\nProcess start to ready: {(time.perf_counter() - profiling.profiler.started) * 1000:.0f}ms")
+            print("\n".join(f"  {file:<20} {seconds * 1000:>8.1f}ms" for file, seconds in self.cog_times.items()))
+            print(profiling.profiler.report())
 
 if __name__ == "__main__":
     exit("The bot cannot be run directly from the bot file.")
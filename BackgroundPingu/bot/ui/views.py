@@ -1,58 +1,77 @@
 import discord
+from typing import TYPE_CHECKING
 from discord.ui import View, Button
-from BackgroundPingu.core.issues import IssueBuilder
+from BackgroundPingu.core.pages import Page
+
+if TYPE_CHECKING:
+    from BackgroundPingu.core.issues import IssueBuilder
 
 class Paginator(View):
-    def __init__(self, messages: list[str], builder: IssueBuilder, post: discord.Message):
-        super().__init__()
-        self.timeout = 180
-        self.disable_on_timeout = True
-        self.page = 0
-        self.uploaded = False
-        self._messages = messages
-        self.builder = builder
-        self.post = post
-        next_button = self.get_item("next")
-        if isinstance(next_button, Button):
-            next_button.disabled = len(self._messages) == 1
-        upload_button = self.get_item("upload")
-        if isinstance(upload_button, Button):
-            upload_button.disabled = self.uploaded or self.builder.has("top_info", "uploaded_log") or self.builder.has("top_info", "uploaded_log_2") or self.builder.has("error", "leaked_session_id_token")
-    
-    async def edit_message(self, interaction: discord.Interaction):
+    """
+    The bot registers one Paginator without a page, which handles the buttons of every result by loading its page
+    from bot.pages, also for results sent before a restart. Paginators with a page only render the buttons.
+    """
+    def __init__(self, page: Page=None, messages: list[str]=None):
+        super().__init__(timeout=None)
+        if page is None: return
+        self.get_item("back").disabled = page.page == 0
+        self.get_item("next").disabled = page.page >= len(messages) - 1
+        keys = page.builder["keys"]
+        self.get_item("upload").disabled = page.uploaded or "top_info.uploaded_log" in keys or "top_info.uploaded_log_2" in keys or "error.leaked_session_id_token" in keys
+        # stopped views aren't kept by the view store, clicks go to the registered one
+        self.stop()
+
+    async def load(self, interaction: discord.Interaction) -> tuple[Page, "IssueBuilder"]:
+        from BackgroundPingu.core.issues import IssueBuilder
+        page = interaction.client.pages.get(interaction.message.id)
+        if page is None:
+            await interaction.response.send_message("This result is too old, use `Check Log` on the message again.", ephemeral=True)
+            return None, None
+        return page, IssueBuilder.from_dict(interaction.client, None, page.builder)
+
+    async def edit_message(self, interaction: discord.Interaction, page: Page, messages: list[str]):
+        interaction.client.pages.put(interaction.message.id, page)
         embed = interaction.message.embeds[0]
-        embed.description = self._messages[self.page]
-        embed.set_footer(text=f"Page {self.page + 1}/{len(self._messages)}")
-        return await interaction.response.edit_message(content="", embeds=[embed], view=self)
+        embed.description = messages[page.page]
+        embed.set_footer(text=f"Page {page.page + 1}/{len(messages)}")
+        view = Paginator(page, messages)
+        if interaction.response.is_done(): return await interaction.edit_original_response(content="", embeds=[embed], view=view)
+        return await interaction.response.edit_message(content="", embeds=[embed], view=view)
 
     @discord.ui.button(emoji="⬅️", custom_id="back", disabled=True)
     async def back_callback(self, button: Button, interaction: discord.Interaction):
-        if self.page == 0: return
-        self.page -= 1
-        button.disabled = self.page == 0
-        next_button = self.get_item("next")
-        if isinstance(next_button, Button):
-            next_button.disabled = False
-        return await self.edit_message(interaction)
-    
+        page, builder = await self.load(interaction)
+        if page is None or page.page == 0: return
+        page.page -= 1
+        return await self.edit_message(interaction, page, builder.build())
+
     @discord.ui.button(emoji="➡️", custom_id="next", disabled=True)
     async def next_callback(self, button: Button, interaction: discord.Interaction):
-        if self.page == len(self._messages) - 1: return
-        self.page += 1
-        button.disabled = self.page == len(self._messages) - 1
-        back_button = self.get_item("back")
-        if isinstance(back_button, Button):
-            back_button.disabled = False
-        return await self.edit_message(interaction)
-    
+        page, builder = await self.load(interaction)
+        if page is None: return
+        messages = builder.build()
+        if page.page >= len(messages) - 1: return
+        page.page += 1
+        return await self.edit_message(interaction, page, messages)
+
     @discord.ui.button(label="Re-Upload Log", emoji="📜", custom_id="upload", disabled=True)
     async def upload_callback(self, button: Button, interaction: discord.Interaction):
-        if interaction.user.id != self.post.author.id:
+        page, builder = await self.load(interaction)
+        if page is None: return
+        if interaction.user.id != page.author_id:
             return await interaction.response.send_message("You're not the original poster of this log.", ephemeral=True)
-        includes, new_url = self.builder.log.upload()
-        self.builder.top_info("uploaded_log" + ("_2" if includes else ""), new_url)
-        self._messages = self.builder.build()
-        button.disabled = True
-        await self.edit_message(interaction)
-        try: await self.post.delete(reason="Re-uploaded log.")
+        # fetching the log again and mclo.gs can take longer than the 3 seconds an interaction has to be answered in
+        await interaction.response.defer()
+        try: post = await interaction.channel.fetch_message(page.post_id)
+        except discord.HTTPException:
+            return await interaction.followup.send("The original message with the log is gone.", ephemeral=True)
+        log = await interaction.client.get_cog("Core").get_log(post, page.source)
+        new_url = None if log is None else await interaction.client.uploader.upload(log)
+        if new_url is None:
+            return await interaction.followup.send("Couldn't upload the log, try again later.", ephemeral=True)
+        builder.top_info("uploaded_log" + ("_2" if "info.leaked_username" in builder.keys else ""), new_url)
+        page.builder = builder.to_dict()
+        page.uploaded = True
+        await self.edit_message(interaction, page, builder.build())
+        try: await post.delete(reason="Re-uploaded log.")
         except discord.Forbidden: pass
@@ -0,0 +1,87 @@
+import os, sys, json, time, enum, tarfile, argparse, multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from BackgroundPingu.core import workers
+from BackgroundPingu.core.parser import Log
+from BackgroundPingu.core.issues import IssueChecker
+
+EXTENSIONS = (".log", ".txt")
+
+def read_logs(path: str):
+    """Yields (name, bytes) for every log in a directory, recursively, or in a tarball."""
+    if os.path.isdir(path):
+        for folder, _, files in os.walk(path):
+            for file in sorted(files):
+                if file.endswith(EXTENSIONS):
+                    with open(os.path.join(folder, file), "rb") as f:
+                        yield os.path.relpath(os.path.join(folder, file), path), f.read()
+    else:
+        with tarfile.open(path, "r:*") as tar:
+            for member in tar:
+                if member.isfile() and member.name.endswith(EXTENSIONS):
+                    yield member.name, tar.extractfile(member).read()
+
+def get_value(value):
+    return value.name if isinstance(value, enum.Enum) else value
+
+def analyse(name: str, data: bytes) -> dict:
+    start = time.perf_counter()
+    record = {
+        "name": name,
+        "size": len(data)
+    }
+    try:
+        checker = IssueChecker(workers._snapshot, Log(data.decode("utf-8", "replace").replace("\r", "")))
+        builder = checker.check()
+        record["issues"] = builder.keys
+        record["facts"] = {fact: get_value(value) for fact, value in checker.get_facts().items()}
+        record["facts"]["minecraft_version"] = checker.log.minecraft_version
+        record["facts"]["java_version"] = checker.log.java_version
+        record["facts"]["mods"] = len(checker.log.mods)
+        record["skipped"] = len(checker.skipped)
+    except Exception as e:
+        record["error"] = repr(e)
+    record["time"] = time.perf_counter() - start
+    return record
+
+def load_data() -> tuple[dict, list]:
+    with open("./BackgroundPingu/data/issues.json", "r") as f:
+        strings = json.load(f)
+    mods = []
+    if os.path.exists("./BackgroundPingu/data/mods.json"):
+        with open("./BackgroundPingu/data/mods.json", "r") as f:
+            mods = json.load(f)
+    return strings, mods
+
+def run(path: str, output, processes: int=None):
+    processes = processes or os.cpu_count() or 1
+    start = time.perf_counter()
+    amount, size = 0, 0
+    with ProcessPoolExecutor(
+        max_workers=processes,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=workers._init_worker,
+        initargs=load_data()
+    ) as executor:
+        # only a few logs per process are read ahead, so archives bigger than memory work
+        pending = set()
+        for name, data in read_logs(path):
+            if len(pending) >= processes * 4:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done: output.write(json.dumps(future.result()) + "\n")
+            pending.add(executor.submit(analyse, name, data))
+            amount += 1
+            size += len(data)
+        for future in wait(pending).done: output.write(json.dumps(future.result()) + "\n")
+    elapsed = time.perf_counter() - start
+    print(f"Checked {amount} logs ({size / 1e6:.1f} MB) in {elapsed:.2f}s, {amount / elapsed:.1f} logs/s, {size / 1e6 / elapsed:.1f} MB/s", file=sys.stderr)
+
+def main():
+    arguments = argparse.ArgumentParser(description="Checks a directory or tarball of logs without connecting to Discord, writing one json line per log.")
+    arguments.add_argument("path", help="directory or tarball of .log and .txt files")
+    arguments.add_argument("-o", "--output", help="jsonl file to write, stdout if not given")
+    arguments.add_argument("-p", "--processes", type=int, help="worker processes, defaults to the number of cpus")
+    args = arguments.parse_args()
+    if args.output is None: run(args.path, sys.stdout, args.processes)
+    else:
+        with open(args.output, "w") as f:
+            run(args.path, f, args.processes)
@@ -0,0 +1,37 @@
+import hashlib, time
+from collections import OrderedDict
+
+class ResultCache:
+    """Bounded LRU of check results, keyed by log content and the version of the loaded data."""
+    def __init__(self, size: int=256, ttl: float=3600) -> None:
+        self.size = size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+
+    @staticmethod
+    def key(content: str, *versions) -> str:
+        return ":".join([hashlib.sha256(content.encode("utf-8", "replace")).hexdigest()] + [str(version) for version in versions])
+
+    def get(self, key: str) -> dict:
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[0] > self.ttl:
+            if not entry is None: del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: str, value: dict):
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
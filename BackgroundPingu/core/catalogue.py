@@ -0,0 +1,157 @@
+import semver, bisect
+from collections import deque
+
+class Automaton:
+    """Aho-Corasick automaton that finds the lowest-valued word contained in a text."""
+    def __init__(self, words: list[tuple[str, int]]) -> None:
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[int] = [None]
+        for word, value in words:
+            state = 0
+            for char in word:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(None)
+                state = next_state
+            self._out[state] = self._lowest(self._out[state], value)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and not char in self._goto[fail]: fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._out[next_state] = self._lowest(self._out[next_state], self._out[self._fail[next_state]])
+
+    @staticmethod
+    def _lowest(a: int, b: int) -> int:
+        if a is None: return b
+        if b is None: return a
+        return min(a, b)
+
+    def search(self, text: str) -> int:
+        state = 0
+        best = self._out[0]
+        for char in text:
+            while state and not char in self._goto[state]: state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            best = self._lowest(best, self._out[state])
+        return best
+
+class VersionRanges:
+    """Sorted, disjoint version intervals. Bounds are (version, inclusive), None is unbounded."""
+    def __init__(self, intervals: list[tuple]) -> None:
+        self._intervals = self._merge(intervals)
+        self._unbounded_start = len(self._intervals) > 0 and self._intervals[0][0] is None
+        self._lows = [interval[0] for interval in self._intervals[1 if self._unbounded_start else 0:]]
+
+    @staticmethod
+    def parse(notation: str) -> tuple:
+        bounds = [semver.Version.parse(bound) if bound != "" else None for bound in notation[1:-1].split(",")]
+        low, high = (bounds[0], bounds[0]) if len(bounds) == 1 else bounds
+        return (low, notation[0] == "[", high, notation[-1] == "]")
+
+    @staticmethod
+    def from_notation(notations: list[str]):
+        return VersionRanges([VersionRanges.parse(notation) for notation in notations])
+
+    def notation(self) -> list[str]:
+        notations = []
+        for low, low_inclusive, high, high_inclusive in self._intervals:
+            if not low is None and low == high: notations.append(f"[{low}]")
+            else: notations.append(f"{'[' if low_inclusive else '('}{low or ''},{high or ''}{']' if high_inclusive else ')'}")
+        return notations
+
+    @staticmethod
+    def _merge(intervals: list[tuple]) -> list[tuple]:
+        merged = []
+        for low, low_inclusive, high, high_inclusive in sorted(intervals, key=lambda i: (not i[0] is None, i[0] or 0, not i[1])):
+            if len(merged) > 0:
+                last_low, last_low_inclusive, last_high, last_high_inclusive = merged[-1]
+                if last_high is None or low is None or low < last_high or (low == last_high and (low_inclusive or last_high_inclusive)):
+                    if last_high is None or high is None: new_high, new_high_inclusive = None, False
+                    elif high > last_high: new_high, new_high_inclusive = high, high_inclusive
+                    elif high == last_high: new_high, new_high_inclusive = high, high_inclusive or last_high_inclusive
+                    else: new_high, new_high_inclusive = last_high, last_high_inclusive
+                    merged[-1] = (last_low, last_low_inclusive, new_high, new_high_inclusive)
+                    continue
+            merged.append((low, low_inclusive, high, high_inclusive))
+        return merged
+
+    def __contains__(self, version: semver.Version) -> bool:
+        index = bisect.bisect_right(self._lows, version) - 1
+        if self._unbounded_start: index += 1
+        if index < 0: return False
+        low, low_inclusive, high, high_inclusive = self._intervals[index]
+        if not low is None and (version < low or (version == low and not low_inclusive)): return False
+        if not high is None and (version > high or (version == high and not high_inclusive)): return False
+        return True
+
+class CompiledFile:
+    def __init__(self, file_data: dict) -> None:
+        self.data = file_data
+        intervals = [VersionRanges.parse(notation) for notation in file_data.get("game_version_ranges", [])]
+        self.ranges = VersionRanges(intervals)
+        self.listed = VersionRanges([interval for interval in intervals if not interval[0] is None and not interval[2] is None])
+
+class Catalogue:
+    """Lookup structures over mods.json, built once whenever the mods are loaded."""
+    def __init__(self, mods: list[dict]) -> None:
+        self.mods = mods
+        self._names = Automaton([(self.normalize_name(mod["name"]), i) for i, mod in enumerate(mods)])
+        self._files = {id(mod): [CompiledFile(file_data) for file_data in mod["files"]] for mod in mods}
+        self._latest: dict[tuple[int, str], dict] = {}
+
+    def __getstate__(self) -> dict:
+        # files are keyed by id(), which doesn't survive pickling, so they're stored in the order of the mods
+        return {"mods": self.mods, "names": self._names, "files": [self._files[id(mod)] for mod in self.mods]}
+
+    def __setstate__(self, state: dict):
+        self.mods = state["mods"]
+        self._names = state["names"]
+        self._files = {id(mod): files for mod, files in zip(self.mods, state["files"])}
+        self._latest = {}
+
+    @staticmethod
+    def normalize_name(name: str) -> str:
+        name = name.lower().replace(" ", "").replace("-", "").replace("_", "")
+        name = "zbufferfog" if name == "legacyplanarfog" else name
+        name = "dynamicmenufps" if name == "dynamicfps" else name
+        return name
+
+    @staticmethod
+    def normalize_filename(filename: str) -> str:
+        filename = filename.lower().replace("optifine", "optifabric")
+        return filename.replace(" ", "").replace("-", "").replace("+", "").replace("_", "")
+
+    def get_mod_metadata(self, mod_filename: str) -> dict:
+        # the first mod in mods.json whose name is contained in the filename wins
+        index = self._names.search(self.normalize_filename(mod_filename))
+        return self.mods[index] if not index is None else None
+
+    def get_latest_version(self, metadata: dict, minecraft_version: str) -> dict:
+        key = (id(metadata), minecraft_version)
+        if not key in self._latest:
+            if len(self._latest) > 10000: self._latest.clear()
+            self._latest[key] = self._find_latest_version(metadata, minecraft_version)
+        return self._latest[key]
+
+    def _find_latest_version(self, metadata: dict, minecraft_version: str) -> dict:
+        if minecraft_version is None: return None
+        if minecraft_version.count(".") == 1: minecraft_version += ".0"
+        try: parsed_version = semver.Version.parse(minecraft_version)
+        except: return None
+        files = self._files.get(id(metadata))
+        if files is None: files = [CompiledFile(file_data) for file_data in metadata["files"]]
+        latest_match = None
+        for compiled_file in files:
+            if parsed_version in compiled_file.ranges:
+                if parsed_version in compiled_file.listed: return compiled_file.data
+                latest_match = compiled_file.data
+        return latest_match
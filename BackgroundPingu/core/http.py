@@ -0,0 +1,21 @@
+import aiohttp
+
+TIMEOUT = aiohttp.ClientTimeout(total=10, connect=5)
+LIMIT = 64
+LIMIT_PER_HOST = 4
+KEEPALIVE = 60
+
+def create_session() -> aiohttp.ClientSession:
+    """One session per bot, so connections to paste.ee, mclo.gs and the Discord CDN are pooled and kept alive between logs."""
+    connector = aiohttp.TCPConnector(
+        limit=LIMIT,
+        limit_per_host=LIMIT_PER_HOST,
+        keepalive_timeout=KEEPALIVE,
+        ttl_dns_cache=300
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=TIMEOUT,
+        headers={"Accept-Encoding": "gzip, deflate"},
+        auto_decompress=True
+    )
@@ -1,10 +1,13 @@
-import semver, re, requests
+import re, time, functools
+from typing import TYPE_CHECKING
 from packaging import version
-from BackgroundPingu.bot.main import BackgroundPingu
-from BackgroundPingu.core.parser import Log, ModLoader, OperatingSystem
+from BackgroundPingu.core.parser import Log, ModLoader, OperatingSystem, Section, MAX_LOG_SIZE, SECTION_MARKERS
+
+if TYPE_CHECKING:
+    from BackgroundPingu.bot.main import BackgroundPingu
 
 class IssueBuilder:
-    def __init__(self, bot: BackgroundPingu, log: Log) -> None:
+    def __init__(self, bot: "BackgroundPingu", log: Log) -> None:
         self.bot = bot
         self._messages = {
             "top_info": [],
@@ -16,31 +19,33 @@ class IssueBuilder:
         self.log = log
         self.amount = 0
         self._last_added = None
+        self.keys: list[str] = []
     
-    def _add_to(self, type: str, value: str, add: bool=False):
+    def _add_to(self, type: str, key: str, value: str, add: bool=False):
         self._messages[type].append(value)
+        self.keys.append(f"{'add' if add else type}.{key}")
         if not add:
             self.amount += 1
             self._last_added = type
         return self
 
     def top_info(self, key: str, *args):
-        return self._add_to("top_info", "‼️ **" + self.bot.strings.get(f"top_info.{key}", key).format(*args) + "**")
+        return self._add_to("top_info", key, "‼️ **" + self.bot.strings.get(f"top_info.{key}", key).format(*args) + "**")
 
     def error(self, key: str, *args):
-        return self._add_to("error", "<:dangerkekw:1123554236626636880> " + self.bot.strings.get(f"error.{key}", key).format(*args))
+        return self._add_to("error", key, "<:dangerkekw:1123554236626636880> " + self.bot.strings.get(f"error.{key}", key).format(*args))
     
     def warning(self, key: str, *args):
-        return self._add_to("warning", "<:warningkekw:1123563914454634546> " + self.bot.strings.get(f"warning.{key}", key).format(*args))
+        return self._add_to("warning", key, "<:warningkekw:1123563914454634546> " + self.bot.strings.get(f"warning.{key}", key).format(*args))
     
     def note(self, key: str, *args):
-        return self._add_to("note", "<:kekw:1123554521738657842> " + self.bot.strings.get(f"note.{key}", key).format(*args))
+        return self._add_to("note", key, "<:kekw:1123554521738657842> " + self.bot.strings.get(f"note.{key}", key).format(*args))
 
     def info(self, key: str, *args):
-        return self._add_to("info", "<:infokekw:1123567743355060344> " + self.bot.strings.get(f"info.{key}", key).format(*args))
+        return self._add_to("info", key, "<:infokekw:1123567743355060344> " + self.bot.strings.get(f"info.{key}", key).format(*args))
 
     def add(self, key: str, *args):
-        return self._add_to(self._last_added, "<:reply:1121924702756143234>*" + self.bot.strings.get(f"add.{key}", key).format(*args) + "*", add=True)
+        return self._add_to(self._last_added, key, "<:reply:1121924702756143234>*" + self.bot.strings.get(f"add.{key}", key).format(*args) + "*", add=True)
 
     def has(self, type: str, key: str) -> bool:
         key = self.bot.strings.get(f"{type}.{key}", key)
@@ -52,6 +57,23 @@ class IssueBuilder:
     def has_values(self) -> bool:
         return self.amount > 0
 
+    def to_dict(self) -> dict:
+        return {
+            "messages": self._messages,
+            "amount": self.amount,
+            "last_added": self._last_added,
+            "keys": self.keys
+        }
+
+    @staticmethod
+    def from_dict(bot: "BackgroundPingu", log: Log, data: dict):
+        builder = IssueBuilder(bot, log)
+        builder._messages = {type: list(messages) for type, messages in data["messages"].items()}
+        builder.amount = data["amount"]
+        builder._last_added = data["last_added"]
+        builder.keys = list(data["keys"])
+        return builder
+
     def build(self) -> list[str]:
         messages = []
         index = 0
@@ -63,8 +85,62 @@ class IssueBuilder:
                 index += 1
         return messages
 
+class Rule:
+    def __init__(self, name: str, function, facts: list[str], needles: list[str], when: dict[str, list], section: Section) -> None:
+        self.name = name
+        self.function = function
+        self.facts = facts
+        self.needles = needles
+        self.when = when
+        self.section = section
+        # needles the rule searched for that it didn't declare, so the next log can find them in the shared pass
+        self.learned: dict[str, None] = {}
+
+RULES: list[Rule] = []
+
+def rule(facts: list[str]=[], needles: list[str]=[], when: dict[str, list]={}, section: Section=None):
+    """
+    Registers an IssueChecker method as a rule, rules run in the order they're defined in.
+    facts are the Log properties a rule reads, they're computed before the rule is timed. If a rule has needles, it can't add anything unless the log contains at least one of them.
+    when maps names from IssueChecker.get_facts to the values a rule can add anything for.
+    section is the part of the log a rule's needles can be in, they're only looked for there.
+    """
+    def decorator(function):
+        for fact in facts:
+            # properties are on the class, fields like truncated only on instances
+            if not hasattr(Log, fact) and not fact in vars(Log("")): raise ValueError(f"Rule {function.__name__} reads {fact}, which isn't a Log property.")
+        RULES.append(Rule(function.__name__, function, facts, needles, when, section))
+        return function
+    return decorator
+
+# rules that apply to each combination of facts, most logs share a handful of combinations
+_plans: dict[tuple, list[Rule]] = {}
+
+def get_plan(facts: dict) -> list[Rule]:
+    key = tuple(facts.values())
+    plan = _plans.get(key)
+    if plan is None:
+        if len(_plans) > 1000: _plans.clear()
+        plan = _plans[key] = [checker_rule for checker_rule in RULES if all(facts[fact] in values for fact, values in checker_rule.when.items())]
+    return plan
+
+@functools.lru_cache(maxsize=4096)
+def mod_token(mod: str) -> str:
+    """The part of a mod's filename that's looked for in stacktraces, like sodium for sodium-fabric-mc0.2.0+build.4-1.16.5.jar."""
+    mod_name = mod.lower().replace(".jar", "")
+    for c in ["+", "-", "_", "=", ",", " "]: mod_name = mod_name.replace(c, "-")
+    mod_name_parts = mod_name.split("-")
+    mod_name = ""
+    for part in mod_name_parts:
+        part0 = part
+        for c in [".", "fabric", "forge", "quilt", "v", "mc", "mod", "backport", "snapshot", "build", "prism"]: part = part.replace(c, "")
+        for c in range(10): part = part.replace(str(c), "")
+        if part == "": break
+        elif len(part) > 1: mod_name += part0
+    return mod_name if len(mod_name) > 2 else ""
+
 class IssueChecker:
-    def __init__(self, bot: BackgroundPingu, log: Log) -> None:
+    def __init__(self, bot: "BackgroundPingu", log: Log) -> None:
         self.bot = bot
         self.log = log
         self.java_17_mods = [
@@ -114,57 +190,81 @@ class IssueChecker:
         ]
     
     def get_mod_metadata(self, mod_filename: str) -> dict:
-        mod_filename = mod_filename.lower().replace("optifine", "optifabric")
-        filename = mod_filename.replace(" ", "").replace("-", "").replace("+", "").replace("_", "")
-        for mod in self.bot.mods:
-            original_name = mod["name"].lower()
-            mod_name = original_name.replace(" ", "").replace("-", "").replace("_", "")
-            mod_name = "zbufferfog" if mod_name == "legacyplanarfog" else mod_name
-            mod_name = "dynamicmenufps" if mod_name == "dynamicfps" else mod_name
-            if mod_name in filename: return mod
-        return None
+        return self.bot.catalogue.get_mod_metadata(mod_filename)
     
-    def get_latest_version(self, metadata: dict) -> bool:
-        if self.log.minecraft_version is None: return None
-        formatted_mc_version = self.log.minecraft_version
-        if formatted_mc_version.count(".") == 1: formatted_mc_version += ".0"
-        try: minecraft_version = semver.Version.parse(formatted_mc_version)
-        except: return None
-        latest_match = None
-        for file_data in metadata["files"]:
-            for game_version in file_data["game_versions"]:
-                all_versions = game_version.split(" ")
-                for version in all_versions:
-                    try:
-                        if minecraft_version.match(version):
-                            latest_match = file_data
-                            if str(minecraft_version) in version:
-                                return latest_match
-                    except ValueError: continue
-        return latest_match
+    def get_latest_version(self, metadata: dict) -> dict:
+        return self.bot.catalogue.get_latest_version(metadata, self.log.minecraft_version)
 
     def check(self) -> IssueBuilder:
         builder = IssueBuilder(self.bot, self.log)
+        self.is_mcsr_log = any(self.log.has_mod(mcsr_mod) for mcsr_mod in self.mcsr_mods) or self.log.minecraft_version == "1.16.1"
+        self.found_crash_cause = False
+        self.timings = {}
+        self.skipped = []
+        start = time.perf_counter()
+        plan = get_plan(self.get_facts())
+        self.timings["facts"] = time.perf_counter() - start
+        # find the needles of every applicable rule up front, so their cost isn't put on whichever rule happens to search first
+        start = time.perf_counter()
+        # needles of rules with a section are looked for in it instead, which needs the markers the sections are split at
+        needles = [needle for checker_rule in plan for needle in (checker_rule.needles if checker_rule.section is None else []) + list(checker_rule.learned)]
+        if any(not checker_rule.section is None for checker_rule in plan): needles += SECTION_MARKERS
+        self.log.scan(needles)
+        self.timings["needle_scan"] = time.perf_counter() - start
+        for checker_rule in plan:
+            if len(checker_rule.needles) > 0 and not any(self.log.has_content(needle, checker_rule.section) for needle in checker_rule.needles):
+                self.skipped.append(checker_rule.name)
+                continue
+            # whichever rule reads a fact first would otherwise be timed for working it out
+            start = time.perf_counter()
+            for fact in checker_rule.facts: getattr(self.log, fact)
+            self.timings["facts"] += time.perf_counter() - start
+            searched = len(self.log._offsets)
+            start = time.perf_counter()
+            checker_rule.function(self, builder)
+            self.timings[checker_rule.name] = time.perf_counter() - start
+            if len(self.log._offsets) > searched: checker_rule.learned.update(dict.fromkeys(list(self.log._offsets)[searched:]))
+        if len(plan) < len(RULES): self.skipped += [checker_rule.name for checker_rule in RULES if not checker_rule in plan]
+        return builder
 
-        is_mcsr_log = any(self.log.has_mod(mcsr_mod) for mcsr_mod in self.mcsr_mods) or self.log.minecraft_version == "1.16.1"
-        found_crash_cause = False
-        illegal_mods = []
-        checked_mods = []
-        outdated_mods = []
-        all_incompatible_mods = {}
+    def get_facts(self) -> dict:
+        return {
+            "mod_loader": self.log.mod_loader,
+            "operating_system": self.log.operating_system,
+            "short_version": self.log.short_version,
+            "launcher": self.log.launcher,
+            "is_mcsr_log": self.is_mcsr_log,
+            "has_mods": len(self.log.mods) > 0,
+            "truncated": self.log.truncated
+        }
 
+    @rule(needles=["(Session ID is token:"])
+    def leaked_session_id_token(self, builder: IssueBuilder):
         if self.log.has_content("(Session ID is token:") and not self.log.has_content("(Session ID is token:<"):
             builder.error("leaked_session_id_token")
-        
+
+    @rule(needles=["/Users/", "/home/"])
+    def leaked_username(self, builder: IssueBuilder):
         match = re.search(r"/(Users|home)/([^/]+)/", self.log._content)
         if match and match.group(2).lower() not in ["user", "admin", "********"]:
             builder.info("leaked_username")
-        match = None
+
+    @rule(facts=["truncated"], when={"truncated": [True]})
+    def truncated_log(self, builder: IssueBuilder):
+        if self.log.truncated:
+            builder.note("truncated_log", MAX_LOG_SIZE // (1024 * 1024))
+
+    @rule(facts=["mods", "minecraft_version"], when={"has_mods": [True]})
+    def mod_versions(self, builder: IssueBuilder):
+        illegal_mods = []
+        checked_mods = []
+        outdated_mods = []
+        all_incompatible_mods = {}
 
         for mod in self.log.mods:
             metadata = self.get_mod_metadata(mod)
             if not metadata is None:
-                if is_mcsr_log:
+                if self.is_mcsr_log:
                     mod_name = metadata["name"]
 
                     try:
@@ -200,11 +300,15 @@ class IssueChecker:
             for incompatible_mod in value:
                 if self.log.has_mod(incompatible_mod):
                     builder.error("incompatible_mod", key, incompatible_mod)
-        
+
+    @rule(facts=["operating_system", "mods"], when={"operating_system": [OperatingSystem.MACOS], "has_mods": [True]})
+    def not_using_mac_sodium(self, builder: IssueBuilder):
         if not self.log.operating_system is None and self.log.operating_system == OperatingSystem.MACOS:
             if self.log.has_mod("sodium-1.16.1-v1") or self.log.has_mod("sodium-1.16.1-v2"):
                 builder.error("not_using_mac_sodium")
-        
+
+    @rule(facts=["major_java_version", "short_version", "mods"], when={"has_mods": [True]})
+    def need_java_17_mods(self, builder: IssueBuilder):
         if not self.log.major_java_version is None and self.log.major_java_version < 17 and not self.log.short_version == "1.12":
             wrong_mods = []
             for mod in self.java_17_mods:
@@ -222,13 +326,17 @@ class IssueChecker:
                     f", but you're using `Java {self.log.major_java_version}`" if not self.log.major_java_version is None
                     else ""
                 ).add("java_update_guide")
-                found_crash_cause = True
-        
-        if not found_crash_cause and self.log.has_content("require the use of Java 17"):
+                self.found_crash_cause = True
+
+    @rule(needles=["require the use of Java 17"])
+    def need_java_17_mc(self, builder: IssueBuilder):
+        if not self.found_crash_cause and self.log.has_content("require the use of Java 17"):
             builder.error("need_java_17_mc").add("java_update_guide")
-            found_crash_cause = True
-        
-        if not found_crash_cause:
+            self.found_crash_cause = True
+
+    @rule(needles=["java.lang.UnsupportedClassVersionError", "The requested compatibility level "])
+    def need_new_java(self, builder: IssueBuilder):
+        if not self.found_crash_cause:
             needed_java_version = None
             if self.log.has_content("java.lang.UnsupportedClassVersionError"):
                 match = re.compile(r"class file version (\d+\.\d+)").search(self.log._content)
@@ -243,43 +351,60 @@ class IssueChecker:
                 except: pass
             if not needed_java_version is None:
                 builder.error("need_new_java", needed_java_version).add("java_update_guide")
-                found_crash_cause = True
-        
-        if not found_crash_cause and any(self.log.has_content(crash_32_bit_java) for crash_32_bit_java in [
+                self.found_crash_cause = True
+
+    @rule(needles=["Could not reserve enough space for ", "Invalid maximum heap size: "])
+    def java_32_bit_crash(self, builder: IssueBuilder):
+        if not self.found_crash_cause and any(self.log.has_content(crash_32_bit_java) for crash_32_bit_java in [
             "Could not reserve enough space for ",
             "Invalid maximum heap size: "
         ]):
             builder.error("32_bit_java_crash").add("java_update_guide")
-            found_crash_cause = True
-        
+            self.found_crash_cause = True
+
+    @rule(facts=["operating_system", "launcher"])
+    def java_32_bit(self, builder: IssueBuilder):
         if self.log.has_content("mcwrap.py"): pass
         
-        elif not found_crash_cause and self.log.has_content("You might want to install a 64bit Java version"):
+        elif not self.found_crash_cause and self.log.has_content("You might want to install a 64bit Java version"):
             if not self.log.operating_system is None and self.log.operating_system == OperatingSystem.MACOS:
                 builder.error("arm_java_multimc").add("mac_setup_guide")
             else:
                 builder.error("32_bit_java").add("java_update_guide")
-            found_crash_cause = True
+            self.found_crash_cause = True
 
         elif not self.log.launcher is None and self.log.launcher.lower() == "multimc" and not self.log.operating_system is None and self.log.operating_system == OperatingSystem.MACOS:
             builder.note("use_prism").add("mac_setup_guide")
-        
-        if self.log.has_content("The java binary \"\" couldn't be found."):
+
+    @rule(needles=["The java binary \"\" couldn't be found."], section=Section.HEADER)
+    def no_java(self, builder: IssueBuilder):
+        if self.log.has_content("The java binary \"\" couldn't be found.", Section.HEADER):
             builder.error("no_java").add("java_update_guide")
-            found_crash_cause = True
-        
+            self.found_crash_cause = True
+
+    @rule(needles=["java.awt.AWTError: Assistive Technology not found: org.GNOME.Accessibility.AtkWrapper"])
+    def headless_java(self, builder: IssueBuilder):
         if self.log.has_content("java.awt.AWTError: Assistive Technology not found: org.GNOME.Accessibility.AtkWrapper"):
             builder.error("headless_java")
-            found_crash_cause = True
-
-        if not found_crash_cause and (any(self.log.has_content(broken_java) for broken_java in [
+            self.found_crash_cause = True
+
+    @rule(needles=[
+        "Could not start java:\n\n\nCheck your MultiMC Java settings.",
+        "Incompatible magic value 0 in class file sun/security/provider/SunEntries",
+        "Assertion `version->filename == NULL || ! _dl_name_match_p (version->filename, map)' failed",
+        "The java binary \""
+    ])
+    def broken_java(self, builder: IssueBuilder):
+        if not self.found_crash_cause and (any(self.log.has_content(broken_java) for broken_java in [
             "Could not start java:\n\n\nCheck your MultiMC Java settings.",
             "Incompatible magic value 0 in class file sun/security/provider/SunEntries",
             "Assertion `version->filename == NULL || ! _dl_name_match_p (version->filename, map)' failed"
         ]) or not re.compile(r"The java binary \"(.+)\" couldn't be found.").search(self.log._content) is None):
             builder.error("broken_java").add("java_update_guide")
-            found_crash_cause = True
-        
+            self.found_crash_cause = True
+
+    @rule(facts=["mod_loader", "fabric_version", "mods", "short_version", "minecraft_version", "is_prism"])
+    def fabric_version(self, builder: IssueBuilder):
         if any(self.log.has_content(new_java_old_fabric) for new_java_old_fabric in [
             "java.lang.IllegalArgumentException: Unsupported class file major version ",
             "java.lang.IllegalArgumentException: Class file major version "
@@ -287,7 +412,7 @@ class IssueChecker:
             mod_loader = self.log.mod_loader.value if self.log.mod_loader.value is not None else "mod"
             builder.error("new_java_old_fabric_crash", mod_loader, mod_loader)
             if self.log.short_version in [f"1.{14 + i}" for i in range(10)]: builder.add("fabric_guide_prism" if self.log.is_prism else "fabric_guide_mmc", "update")
-            found_crash_cause = True
+            self.found_crash_cause = True
         elif not self.log.mod_loader is None and self.log.mod_loader == ModLoader.FABRIC and not self.log.fabric_version is None:
             highest_srigt_ver = None
             for mod in self.log.mods:
@@ -304,12 +429,12 @@ class IssueChecker:
                         builder.error("incompatible_srigt")
                         if not self.log.minecraft_version == "1.16.1":
                             builder.add("incompatible_srigt_alternative")
-                        found_crash_cause = True
+                        self.found_crash_cause = True
                 except: pass
             
             if self.log.has_content("java.lang.ClassNotFoundException: can't find class com.llamalad7.mixinextras.MixinExtrasBootstrap"):
                 builder.error("old_fabric_crash").add("fabric_guide_prism" if self.log.is_prism else "fabric_guide_mmc", "update")
-                found_crash_cause = True
+                self.found_crash_cause = True
             
             else:
                 try:
@@ -325,20 +450,26 @@ class IssueChecker:
                         builder.error("broken_fabric")
                         if self.log.short_version in [f"1.{14 + i}" for i in range(10)]: builder.add("fabric_guide_prism" if self.log.is_prism else "fabric_guide_mmc", "update")
                 except: pass
-        
+
+    @rule(facts=["mod_loader", "short_version", "is_prism"], when={"mod_loader": [ModLoader.QUILT, ModLoader.FORGE]})
+    def using_other_loader(self, builder: IssueBuilder):
         if not self.log.mod_loader in [None, ModLoader.FABRIC, ModLoader.VANILLA]:
-            if is_mcsr_log:
+            if self.is_mcsr_log:
                 builder.error("using_other_loader_mcsr", self.log.mod_loader.value)
                 if self.log.short_version in [f"1.{14 + i}" for i in range(10)]: builder.add("fabric_guide_prism" if self.log.is_prism else "fabric_guide_mmc", "install")
-                found_crash_cause = True
+                self.found_crash_cause = True
             else:
                 builder.note("using_other_loader", self.log.mod_loader.value)
 
+    @rule(facts=["mods", "mod_loader", "short_version", "is_prism"], when={"mod_loader": [ModLoader.VANILLA], "has_mods": [True]})
+    def no_loader(self, builder: IssueBuilder):
         if len(self.log.mods) > 0 and self.log.mod_loader == ModLoader.VANILLA:
             builder.error("no_loader")
             if self.log.short_version in [f"1.{14 + i}" for i in range(10)]: builder.add("fabric_guide_prism" if self.log.is_prism else "fabric_guide_mmc", "install")
-        
-        if not found_crash_cause:
+
+    @rule(facts=["mods", "mod_loader"], when={"mod_loader": [ModLoader.FABRIC, ModLoader.QUILT, ModLoader.FORGE], "has_mods": [True]})
+    def rong_modloader(self, builder: IssueBuilder):
+        if not self.found_crash_cause:
             has_fabric_mod = any(self.log.has_mod(mcsr_mod) for mcsr_mod in self.mcsr_mods) or self.log.has_mod("fabric")
             has_quilt_mod = self.log.has_mod("quilt")
             has_forge_mod = self.log.has_mod("forge")
@@ -346,17 +477,19 @@ class IssueChecker:
             if has_forge_mod and not has_quilt_mod and not has_fabric_mod:
                 if self.log.mod_loader == ModLoader.FABRIC:
                     builder.error("rong_modloader", "Forge", "Fabric")
-                    found_crash_cause = True
+                    self.found_crash_cause = True
                 elif self.log.mod_loader == ModLoader.QUILT:
                     builder.error("rong_modloader", "Forge", "Quilt")
-                    found_crash_cause = True
+                    self.found_crash_cause = True
             elif has_fabric_mod and not has_forge_mod and self.log.mod_loader == ModLoader.FORGE:
                 builder.error("rong_modloader", "Fabric", "Forge")
-                found_crash_cause = True
+                self.found_crash_cause = True
             elif has_quilt_mod and not has_forge_mod and self.log.mod_loader == ModLoader.FORGE:
                 builder.error("rong_modloader", "Quilt", "Forge")
-                found_crash_cause = True
-        
+                self.found_crash_cause = True
+
+    @rule(facts=["max_allocated", "java_arguments", "is_multimc_or_fork", "short_version"])
+    def allocated_ram(self, builder: IssueBuilder):
         if not self.log.max_allocated is None:
             has_shenandoah = self.log.has_java_argument("shenandoah")
             min_limit_1 = 1200 if has_shenandoah else 1900
@@ -364,12 +497,12 @@ class IssueChecker:
             ram_guide = "allocate_ram_guide_mmc" if self.log.is_multimc_or_fork else "allocate_ram_guide"
             if (self.log.max_allocated < min_limit_1 and self.log.has_content(" -805306369")) or self.log.has_content("OutOfMemoryError") or self.log.has_content("GL error GL_OUT_OF_MEMORY"):
                 builder.error("too_little_ram_crash").add(ram_guide)
-                found_crash_cause = True
+                self.found_crash_cause = True
             elif self.log.max_allocated < min_limit_2:
                 builder.warning("too_little_ram").add(ram_guide)
             elif self.log.max_allocated < min_limit_1:
                 builder.note("too_little_ram").add(ram_guide)
-            if is_mcsr_log and not self.log.short_version in [f"1.{18 + i}" for i in range(10)]:
+            if self.is_mcsr_log and not self.log.short_version in [f"1.{18 + i}" for i in range(10)]:
                 if self.log.max_allocated > 10000:
                     builder.error("too_much_ram").add(ram_guide)
                 elif self.log.max_allocated > 4800:
@@ -379,7 +512,9 @@ class IssueChecker:
         elif self.log.has_content("OutOfMemoryError") or self.log.has_content("GL error GL_OUT_OF_MEMORY"):
             ram_guide = "allocate_ram_guide_mmc" if self.log.is_multimc_or_fork else "allocate_ram_guide"
             builder.error("too_little_ram_crash").add(ram_guide)
-        
+
+    @rule(facts=["minecraft_folder", "launcher"])
+    def minecraft_folder(self, builder: IssueBuilder):
         if not self.log.minecraft_folder is None:
             if "OneDrive" in self.log.minecraft_folder:
                 builder.note("onedrive")
@@ -387,7 +522,9 @@ class IssueChecker:
                 builder.note("program_files")
             if "Rar$" in self.log.minecraft_folder:
                 builder.error("need_to_extract_from_zip",self.log.launcher if not self.log.launcher is None else "the launcher")
-        
+
+    @rule(facts=["mods", "minecraft_version"], when={"has_mods": [True]})
+    def starlight_better(self, builder: IssueBuilder):
         if self.log.has_mod("phosphor") and not self.log.minecraft_version == "1.12.2":
             builder.note("starlight_better")
             metadata = self.get_mod_metadata("starlight")
@@ -395,16 +532,29 @@ class IssueChecker:
                 latest_version = self.get_latest_version(metadata)
                 if not latest_version is None:
                     builder.add("mod_download", metadata["name"], latest_version["page"])
-        
-        if self.log.has_content("Failed to download the assets index"):
+
+    @rule(needles=["Failed to download the assets index"], section=Section.HEADER)
+    def assets_index_fail(self, builder: IssueBuilder):
+        if self.log.has_content("Failed to download the assets index", Section.HEADER):
             builder.error("assets_index_fail")
-        
+
+    @rule(needles=["Invalid id 4096 - maximum id range exceeded"])
+    def exceeded_id_limit(self, builder: IssueBuilder):
         if self.log.has_content("Invalid id 4096 - maximum id range exceeded"):
             builder.error("exceeded_id_limit")
-        
+
+    @rule(needles=["NSWindow drag regions should only be invalidated on the Main Thread"])
+    def mac_too_new_java(self, builder: IssueBuilder):
         if self.log.has_content("NSWindow drag regions should only be invalidated on the Main Thread"):
             builder.error("mac_too_new_java")
-        
+
+    @rule(facts=["mods"], needles=[
+        "Pixel format not accelerated",
+        "C  [ig",
+        "A fatal error has been detected by the Java Runtime Environment",
+        "EXCEPTION_ACCESS_VIOLATION"
+    ])
+    def eav_crash(self, builder: IssueBuilder):
         if self.log.has_content("Pixel format not accelerated") or not re.compile(r"C  \[(ig[0-9]+icd[0-9]+\.dll)[+ ](0x[0-9a-f]+)\]").search(self.log._content) is None:
             if self.log.has_mod("speedrunigt"):
                 builder.error("eav_crash").add("eav_crash_srigt")
@@ -416,21 +566,34 @@ class IssueChecker:
             for i in range(5): builder.add(f"eav_crash_{i + 1}")
             if self.log.has_mod("speedrunigt"): builder.add("eav_crash_srigt")
             builder.add("eav_crash_disclaimer")
-        
+
+    @rule(needles=["WGL_ARB_create_context_profile is unavailable"])
+    def intel_hd2000(self, builder: IssueBuilder):
         if self.log.has_content("WGL_ARB_create_context_profile is unavailable"):
             builder.error("intel_hd2000").add("intell_hd2000_info")
 
+    @rule(needles=[
+        "org.lwjgl.LWJGLException: Could not choose GLX13 config",
+        "GLFW error 65545: GLX: Failed to find a suitable GLXFBConfig"
+    ])
+    def outdated_nvidia_flatpack_driver(self, builder: IssueBuilder):
         if self.log.has_content("org.lwjgl.LWJGLException: Could not choose GLX13 config") or self.log.has_content("GLFW error 65545: GLX: Failed to find a suitable GLXFBConfig"):
             builder.error("outdated_nvidia_flatpack_driver")
-        
+
+    @rule(needles=["java.lang.NoSuchMethodError: sun.security.util.ManifestEntryVerifier.<init>(Ljava/util/jar/Manifest;)V"])
+    def forge_java_bug(self, builder: IssueBuilder):
         if self.log.has_content("java.lang.NoSuchMethodError: sun.security.util.ManifestEntryVerifier.<init>(Ljava/util/jar/Manifest;)V"):
             builder.error("forge_java_bug")
-            found_crash_cause = True
-        
+            self.found_crash_cause = True
+
+    @rule(needles=["java.lang.IllegalStateException: GLFW error before init: [0x10008]Cocoa: Failed to find service port for display"])
+    def incompatible_forge_mac(self, builder: IssueBuilder):
         if self.log.has_content("java.lang.IllegalStateException: GLFW error before init: [0x10008]Cocoa: Failed to find service port for display"):
             builder.error("incompatible_forge_mac")
-            found_crash_cause = True
-        
+            self.found_crash_cause = True
+
+    @rule(facts=["launcher", "is_prism"], needles=["Using system GLFW", "Using system OpenAL"])
+    def builtin_lib(self, builder: IssueBuilder):
         system_libs = [lib for lib in ["GLFW", "OpenAL"] if self.log.has_content("Using system " + lib)]
         system_arg = None
         if len(system_libs) == 2: system_arg = f"{system_libs[0]} and {system_libs[1]} installations"
@@ -441,24 +604,37 @@ class IssueChecker:
                               system_arg,
                               self.log.launcher if self.log.launcher is not None else "your launcher",
                               " > Tweaks" if self.log.is_prism else "")
-                found_crash_cause = True
+                self.found_crash_cause = True
             else: builder.note("builtin_lib_recommendation", system_arg)
 
+    @rule(needles=["requires "])
+    def requires_mod(self, builder: IssueBuilder):
         required_mod_match = re.findall(r"requires (.*?) of (\w+),", self.log._content)
         for required_mod in required_mod_match:
             mod_name = required_mod[1]
             if mod_name.lower() == "fabric": builder.error("requires_fabric_api")
             else: builder.error("requires_mod", mod_name)
-        
-        if self.log.has_mod("fabric-api") and is_mcsr_log:
+
+    @rule(facts=["mods"], when={"is_mcsr_log": [True], "has_mods": [True]})
+    def using_fabric_api(self, builder: IssueBuilder):
+        if self.log.has_mod("fabric-api") and self.is_mcsr_log:
             builder.warning("using_fabric_api")
-        
-        if self.log.has_content("Couldn't extract native jar"):
+
+    @rule(needles=["Couldn't extract native jar"], section=Section.HEADER)
+    def locked_libs(self, builder: IssueBuilder):
+        if self.log.has_content("Couldn't extract native jar", Section.HEADER):
             builder.error("locked_libs")
-        
+
+    @rule(needles=["java.io.IOException: Directory '"])
+    def try_admin_launch(self, builder: IssueBuilder):
         if not re.compile(r"java\.io\.IOException: Directory \'(.+?)\' could not be created").search(self.log._content) is None:
             builder.error("try_admin_launch")
-        
+
+    @rule(facts=["minecraft_version"], needles=[
+        "java.lang.NullPointerException: Cannot invoke \"net.minecraft.class_2680.method_26213()\" because \"state\" is null",
+        "me.jellysquid.mods.sodium.client.SodiumClientMod.options"
+    ])
+    def old_sodium_crash(self, builder: IssueBuilder):
         if self.log.has_content("java.lang.NullPointerException: Cannot invoke \"net.minecraft.class_2680.method_26213()\" because \"state\" is null"):
             builder.error("old_sodium_crash")
             metadata = self.get_mod_metadata("sodium")
@@ -466,37 +642,61 @@ class IssueChecker:
                 latest_version = self.get_latest_version(metadata)
                 if not latest_version is None:
                     builder.add("mod_download", metadata["name"], latest_version["page"])
-            found_crash_cause = True
+            self.found_crash_cause = True
         elif self.log.has_content("me.jellysquid.mods.sodium.client.SodiumClientMod.options"):
             builder.error("sodium_config_crash")
-            found_crash_cause = True
-        
+            self.found_crash_cause = True
+
+    @rule(facts=["minecraft_version", "short_version", "mods"], needles=["java.util.ConcurrentModificationException"], when={"short_version": ["1.16"]})
+    def no_voyager_crash(self, builder: IssueBuilder):
         pattern = r"Uncaught exception in thread \"Thread-\d+\"\njava\.util\.ConcurrentModificationException: null"
         if "java.util.ConcurrentModificationException" in re.sub(pattern, "", self.log._content) and not self.log.minecraft_version is None and self.log.short_version == "1.16" and not self.log.has_mod("voyager"):
             builder.error("no_voyager_crash")
-        
+
+    @rule(needles=[
+        "java.lang.IllegalStateException: Adding Entity listener a second time",
+        "me.jellysquid.mods.lithium.common.entity.tracker.nearby"
+    ])
+    def lithium_crash(self, builder: IssueBuilder):
         if self.log.has_content("java.lang.IllegalStateException: Adding Entity listener a second time") and self.log.has_content("me.jellysquid.mods.lithium.common.entity.tracker.nearby"):
             builder.info("lithium_crash")
-            found_crash_cause = True
-        
-        if is_mcsr_log and any(self.log.has_content(log_spam) for log_spam in [
+            self.found_crash_cause = True
+
+    @rule(needles=[
+        "Using missing texture, unable to load",
+        "Exception loading blockstate definition",
+        "Unable to load model",
+        "java.lang.NullPointerException: Cannot invoke \"com.mojang.authlib.minecraft.MinecraftProfileTexture.getHash()\" because \"?\" is null",
+        " to profiler if profiler tick hasn't started - missing "
+    ], when={"is_mcsr_log": [True]})
+    def log_spam(self, builder: IssueBuilder):
+        if self.is_mcsr_log and any(self.log.has_content(log_spam) for log_spam in [
             "Using missing texture, unable to load",
             "Exception loading blockstate definition",
             "Unable to load model",
             "java.lang.NullPointerException: Cannot invoke \"com.mojang.authlib.minecraft.MinecraftProfileTexture.getHash()\" because \"?\" is null",
             " to profiler if profiler tick hasn't started - missing "
         ]): builder.info("log_spam")
-        
+
+    @rule(facts=["mods"], when={"has_mods": [True]})
+    def using_ssrng(self, builder: IssueBuilder):
         if self.log.has_mod("serversiderng-9"):
             builder.warning("using_ssrng")
-        
+
+    @rule(facts=["mods"])
+    def using_old_ssrng(self, builder: IssueBuilder):
         if any(self.log.has_mod(f"serversiderng-{i}") for i in range(1, 9)):
             builder.error("using_old_ssrng")
         elif self.log.has_content("Failed to light chunk") and self.log.has_content("net.minecraft.class_148: Feature placement") and self.log.has_content("java.lang.ArrayIndexOutOfBoundsException"):
             builder.info("starlight_crash")
-        elif not found_crash_cause and self.log.has_content(" -805306369") or self.log.has_content("java.lang.ArithmeticException"):
+        elif not self.found_crash_cause and self.log.has_content(" -805306369") or self.log.has_content("java.lang.ArithmeticException"):
             builder.warning("exitcode_805306369")
 
+    @rule(facts=["mods"], needles=[
+        " -1073741819",
+        "The instruction at 0x%p referenced memory at 0x%p. The memory could not be %s."
+    ])
+    def exitcode_1073741819(self, builder: IssueBuilder):
         if self.log.has_content(" -1073741819") or self.log.has_content("The instruction at 0x%p referenced memory at 0x%p. The memory could not be %s."):
             builder.error("exitcode", "-1073741819")
             builder.add("exitcode_1073741819_1").add("exitcode_1073741819_2")
@@ -505,12 +705,16 @@ class IssueChecker:
                 builder.add(f"exitcode_1073741819_4")
             builder.add("exitcode_1073741819_5")
 
+    @rule(needles=[" -1073740791"])
+    def exitcode_1073740791(self, builder: IssueBuilder):
         if self.log.has_content(" -1073740791"):
             builder.error("exitcode", "-1073740791")
             builder.add("exitcode_1073741819_2")
             if self.log._content.count("\n") < 500: builder.add("exitcode_1073741819_4")
             builder.add("exitcode_1073741819_5")
-        
+
+    @rule(facts=["mods", "minecraft_version"])
+    def autoreset_user(self, builder: IssueBuilder):
         if self.log.has_mod("autoreset") or self.log.has_content("the mods atum and autoreset"):
             builder.error("autoreset_user")
             metadata = self.get_mod_metadata("atum")
@@ -518,14 +722,18 @@ class IssueChecker:
                 latest_version = self.get_latest_version(metadata)
                 if not latest_version is None:
                     builder.add("mod_download", metadata["name"], latest_version["page"])
-            found_crash_cause = True
+            self.found_crash_cause = True
 
-        if self.log.has_content("Launched instance in offline mode") and self.log.has_content("(missing)\n"):
+    @rule(facts=["is_prism"], needles=["Launched instance in offline mode", "(missing)\n"], section=Section.HEADER)
+    def online_launch_required(self, builder: IssueBuilder):
+        if self.log.has_content("Launched instance in offline mode", Section.HEADER) and self.log.has_content("(missing)\n", Section.HEADER):
             builder.error("online_launch_required", "" if self.log.is_prism else " Instance")
-            found_crash_cause = True
-        
+            self.found_crash_cause = True
+
+    @rule(facts=["short_version", "mod_loader", "operating_system"], needles=["This instance is not compatible with Java version "], section=Section.HEADER)
+    def incorrect_java_prism(self, builder: IssueBuilder):
         pattern = r"This instance is not compatible with Java version (\d+)\.\nPlease switch to one of the following Java versions for this instance:\nJava version (\d+)"
-        match = re.search(pattern, self.log._content)
+        match = re.compile(pattern).search(self.log._content, *self.log.sections[Section.HEADER])
         if not match is None:
             switch_java = False
             if self.log.short_version in [f"1.{17 + i}" for i in range(10)]:
@@ -548,22 +756,34 @@ class IssueChecker:
                     compatible_version
                 )
             else: builder.error("java_comp_check")
-        
+
+    @rule(needles=["java.lang.ClassNotFoundException: org.apache.logging.log4j.spi.AbstractLogger"])
+    def no_abstract_logger(self, builder: IssueBuilder):
         if self.log.has_content("java.lang.ClassNotFoundException: org.apache.logging.log4j.spi.AbstractLogger"):
             builder.error("no_abstract_logger")
-        
+
+    @rule(needles=["ClassLoaders$AppClassLoader cannot be cast to class java.net.URLClassLoader"])
+    def forge_too_new_java(self, builder: IssueBuilder):
         if self.log.has_content("ClassLoaders$AppClassLoader cannot be cast to class java.net.URLClassLoader"):
             builder.error("forge_too_new_java")
-            found_crash_cause = True
-        if not self.log.mod_loader is None and self.log.mod_loader == ModLoader.FORGE and not found_crash_cause:
+            self.found_crash_cause = True
+
+    @rule(facts=["mod_loader"], needles=[
+        "Unable to detect the forge installer!",
+        "java.lang.NoClassDefFoundError: cpw/mods/modlauncher/Launcher"
+    ], when={"mod_loader": [ModLoader.FORGE]})
+    def random_forge_crash(self, builder: IssueBuilder):
+        if not self.log.mod_loader is None and self.log.mod_loader == ModLoader.FORGE and not self.found_crash_cause:
             if self.log.has_content("Unable to detect the forge installer!"):
                 builder.error("random_forge_crash_1")
             if self.log.has_content("java.lang.NoClassDefFoundError: cpw/mods/modlauncher/Launcher"):
                 builder.error("random_forge_crash_2")
-        
+
+    @rule(needles=["Incompatible mod set found! READ THE BELOW LINES!"])
+    def ranked_anticheat(self, builder: IssueBuilder):
         match = re.search(r"Incompatible mod set found! READ THE BELOW LINES!(.*?)(?=at com\.mcsr\.projectelo\.anticheat)", self.log._content, re.DOTALL)
         if match:
-            found_crash_cause = True
+            self.found_crash_cause = True
             ranked_rong_files = []
             ranked_rong_mods = []
             ranked_rong_versions = []
@@ -612,54 +832,85 @@ class IssueChecker:
             elif len(ranked_rong_mods) > 0:
                 builder.error("ranked_rong_mods", f"a mod `{ranked_rong_mods[0]}` that is", "it")
 
+    @rule(needles=["com.mcsr.projectelo.anticheat.file.verifiers.ResourcePackVerifier"])
+    def ranked_resourcepack_crash(self, builder: IssueBuilder):
         if self.log.has_content("com.mcsr.projectelo.anticheat.file.verifiers.ResourcePackVerifier"):
             builder.error("ranked_resourcepack_crash")
-            found_crash_cause = True
-        
+            self.found_crash_cause = True
+
+    @rule(facts=["mods", "short_version"], when={"has_mods": [True]})
+    def optifine_incompatibility(self, builder: IssueBuilder):
         if self.log.has_mod("optifine"):
             if self.log.has_mod("worldpreview"):
                 builder.error("incompatible_mod", "Optifine", "WorldPreview")
-                found_crash_cause = True
+                self.found_crash_cause = True
             if self.log.has_mod("z-buffer-fog") and self.log.short_version in [f"1.{14 + i}" for i in range(10)]:
                 builder.error("incompatible_mod", "Optifine", "z-buffer-fog")
-                found_crash_cause = True
-        
+                self.found_crash_cause = True
+
+    @rule(facts=["mods"], when={"has_mods": [True]})
+    def esimod_incompatibility(self, builder: IssueBuilder):
         if self.log.has_mod("esimod"):
             for incompatible_mod in ["serverSideRNG", "SpeedRunIGT", "WorldPreview", "mcsrranked"]:
                 if self.log.has_mod(incompatible_mod):
                     builder.error("incompatible_mod", "esimod", incompatible_mod)
 
+    @rule(needles=["Mixin apply for mod areessgee failed areessgee.mixins.json:nether.StructureFeatureMixin from mod areessgee -> net.minecraft.class_3195"])
+    def areessgee_incompatibility(self, builder: IssueBuilder):
         if self.log.has_content("Mixin apply for mod areessgee failed areessgee.mixins.json:nether.StructureFeatureMixin from mod areessgee -> net.minecraft.class_3195"):
             builder.error("incompatible_mod", "AreEssGee", "peepoPractice")
-            found_crash_cause = True
-        
+            self.found_crash_cause = True
+
+    @rule(facts=["mods"], when={"has_mods": [True]})
+    def stronghold_trainer_incompatibility(self, builder: IssueBuilder):
         if self.log.has_mod("speedrunigt") and self.log.has_mod("stronghold-trainer"):
             builder.error("incompatible_mod", "SpeedRunIGT", "Stronghold Trainer")
-            found_crash_cause = True
-        
+            self.found_crash_cause = True
+
+    @rule(facts=["mods"], when={"has_mods": [True]})
+    def continuity_dependency(self, builder: IssueBuilder):
         if self.log.has_mod("continuity") and self.log.has_mod("sodium") and not self.log.has_mod("indium"):
             builder.error("missing_dependency", "continuity", "indium")
-            found_crash_cause = True
-        
+            self.found_crash_cause = True
+
+    @rule(facts=["mods"], when={"has_mods": [True]})
+    def carpet_incompatibility(self, builder: IssueBuilder):
         if self.log.has_mod("worldpreview") and self.log.has_mod("carpet"):
             builder.error("incompatible_mod", "WorldPreview", "carpet")
-            found_crash_cause = True
+            self.found_crash_cause = True
 
-        if not found_crash_cause and self.log.has_content("Failed to store chunk") or self.log.has_content("There is not enough space on the disk"):
+    @rule(needles=["Failed to store chunk", "There is not enough space on the disk"])
+    def out_of_disk_space(self, builder: IssueBuilder):
+        if not self.found_crash_cause and self.log.has_content("Failed to store chunk") or self.log.has_content("There is not enough space on the disk"):
             builder.error("out_of_disk_space")
-        
+
+    @rule(facts=["short_version", "mod_loader", "is_prism"], needles=["Mappings not present!"])
+    def no_mappings(self, builder: IssueBuilder):
         if self.log.has_content("Mappings not present!"):
             if not self.log.short_version in [f"1.{14 + i}" for i in range(15)] and self.log.mod_loader == ModLoader.FABRIC:
                 builder.error("legacy_fabric_modpack")
-                found_crash_cause = True
+                self.found_crash_cause = True
             else:
                 builder.warning("no_mappings", "" if self.log.is_prism else " Instance")
 
-        if not found_crash_cause and self.log.has_content("ERROR]: Mixin apply for mod fabric-networking-api-v1 failed"):
+    @rule(needles=["ERROR]: Mixin apply for mod fabric-networking-api-v1 failed"])
+    def delete_dot_fabric(self, builder: IssueBuilder):
+        if not self.found_crash_cause and self.log.has_content("ERROR]: Mixin apply for mod fabric-networking-api-v1 failed"):
             builder.error("delete_dot_fabric")
 
+    @rule(facts=["mods"], needles=[
+        "ERROR]: Mixin apply for mod ",
+        "from mod ",
+        "due to errors, provided by '",
+        "Minecraft has crashed!",
+        "Failed to start Minecraft:",
+        "Unable to launch\n",
+        "Exception caught from launcher\n",
+        "---- Minecraft Crash Report ----"
+    ])
+    def mod_crash(self, builder: IssueBuilder):
         wrong_mods = []
-        if not found_crash_cause:
+        if not self.found_crash_cause:
             for pattern in [
                 r"ERROR]: Mixin apply for mod ([\w\-+]+) failed",
                 r"from mod ([\w\-+]+) failed injection check",
@@ -674,29 +925,16 @@ class IssueChecker:
         
             match = re.search(r"Minecraft has crashed!.*|Failed to start Minecraft:.*|Unable to launch\n.*|Exception caught from launcher\n.*|---- Minecraft Crash Report ----.*A detailed walkthrough of the error", self.log._content, re.DOTALL)
             if not match is None:
-                stacktrace = match.group().lower()
-                if not "this is not a error" in stacktrace:
-                    if len(self.log.mods) == 0:
-                        for mcsr_mod in self.mcsr_mods:
-                            if mcsr_mod.replace("-", "").lower() in stacktrace and not mcsr_mod in wrong_mods and not mcsr_mod.lower() in wrong_mods:
-                                wrong_mods.append(mcsr_mod)
-                    else:
-                        for mod in self.log.mods:
-                            mod_name = mod.lower().replace(".jar", "")
-                            for c in ["+", "-", "_", "=", ",", " "]: mod_name = mod_name.replace(c, "-")
-                            mod_name_parts = mod_name.split("-")
-                            mod_name = ""
-                            for part in mod_name_parts:
-                                part0 = part
-                                for c in [".", "fabric", "forge", "quilt", "v", "mc", "mod", "backport", "snapshot", "build", "prism"]: part = part.replace(c, "")
-                                for c in range(10): part = part.replace(str(c), "")
-                                if part == "": break
-                                elif len(part) > 1: mod_name += part0
-                            if len(mod_name) > 2 and mod_name in stacktrace:
-                                if not mod in wrong_mods: wrong_mods.append(mod)
+                # every name is looked for in one pass over the stacktrace, which can be most of a big log
+                if len(self.log.mods) == 0: tokens = {mcsr_mod: mcsr_mod.replace("-", "").lower() for mcsr_mod in self.mcsr_mods}
+                else: tokens = {mod: mod_token(mod) for mod in self.log.mods}
+                tokens = {mod: token for mod, token in tokens.items() if len(token) > 0 and not "\n" in token}
+                found = self.log.find_in_lines(list(dict.fromkeys(tokens.values())) + ["this is not a error"], match.start(), match.end())
+                if not "this is not a error" in found:
+                    for mod, token in tokens.items():
+                        if token in found and not mod in wrong_mods and not mod.lower() in wrong_mods:
+                            wrong_mods.append(mod)
             if len(wrong_mods) == 1:
                 builder.error("mod_crash", wrong_mods[0])
             elif len(wrong_mods) > 0 and len(wrong_mods) < 6:
                 builder.error("mods_crash", "; ".join(wrong_mods))
-        
-        return builder
@@ -0,0 +1,56 @@
+import sqlite3, json, time
+
+class Page:
+    """What a result message needs for its buttons: the check result instead of the log, and where to get the log again."""
+    def __init__(self, channel_id: int, post_id: int, author_id: int, source: int, builder: dict, page: int=0, uploaded: bool=False, created: float=None) -> None:
+        self.channel_id = channel_id
+        self.post_id = post_id
+        self.author_id = author_id
+        # index of the log among the links and attachments of the post, -1 if the post itself was checked
+        self.source = source
+        self.builder = builder
+        self.page = page
+        self.uploaded = uploaded
+        self.created = created if not created is None else time.time()
+
+class PageStore:
+    """Pages of sent results in sqlite, keyed by the id of the result message, so buttons keep working after a restart."""
+    def __init__(self, path: str="./BackgroundPingu/data/pages.db", ttl: float=7 * 24 * 3600) -> None:
+        self.ttl = ttl
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS pages (
+            message_id INTEGER PRIMARY KEY,
+            channel_id INTEGER,
+            post_id INTEGER,
+            author_id INTEGER,
+            source INTEGER,
+            builder TEXT,
+            page INTEGER,
+            uploaded INTEGER,
+            created REAL
+        )""")
+        self.prune()
+
+    def get(self, message_id: int) -> Page:
+        row = self._db.execute("SELECT channel_id, post_id, author_id, source, builder, page, uploaded, created FROM pages WHERE message_id = ?", (message_id,)).fetchone()
+        if row is None or time.time() - row[7] > self.ttl: return None
+        return Page(row[0], row[1], row[2], row[3], json.loads(row[4]), row[5], bool(row[6]), row[7])
+
+    def put(self, message_id: int, page: Page):
+        with self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (message_id, page.channel_id, page.post_id, page.author_id, page.source, json.dumps(page.builder), page.page, int(page.uploaded), page.created)
+            )
+
+    def prune(self):
+        with self._db:
+            self._db.execute("DELETE FROM pages WHERE created < ?", (time.time() - self.ttl,))
+
+    def close(self):
+        self._db.close()
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
@@ -1,4 +1,6 @@
-import re, requests, enum
+import re, io, enum, asyncio, aiohttp, functools, codecs, zlib, zipfile, tarfile
+from collections import deque
+from typing import AsyncIterator
 from packaging import version
 from cached_property import cached_property
 
@@ -13,10 +15,108 @@ class ModLoader(enum.Enum):
     FORGE = "Forge"
     VANILLA = "Vanilla"
 
+class Section(enum.Enum):
+    HEADER = "header"
+    GAME_OUTPUT = "game_output"
+    CRASH_REPORT = "crash_report"
+    HS_ERR = "hs_err"
+
+# where the crash report and the hs_err dump that end the game output start
+SECTION_MARKERS = ["---- Minecraft Crash Report ----", "# A fatal error has been detected by the Java Runtime Environment"]
+
+MAX_LOG_SIZE = 16 * 1024 * 1024
+HEAD_SIZE = MAX_LOG_SIZE // 8
+CHUNK_SIZE = 64 * 1024
+WINDOW_SIZE = 64 * 1024
+# archives stop being read after this many decompressed bytes, so a zip bomb costs no more than a big log
+MAX_DECOMPRESSED_SIZE = 4 * MAX_LOG_SIZE
+ARCHIVE_EXTENSIONS = (".gz", ".tgz", ".zip")
+
+class Patterns:
+    GAME_OUTPUT = re.compile(r"\[\d{2}:\d{2}:\d{2}\] ")
+    FIRST_GAME_OUTPUT = re.compile(r"^\[\d{2}:\d{2}:\d{2}\] ", re.MULTILINE)
+    MODS = re.compile(r"\[✔️\]\s+([^\[\]]+\.jar)")
+    PRISM_MODS = re.compile(r"\[✔\]\s+([^\[\]\n]+)")
+    JAVA_CHECK = re.compile(r"Checking Java version\.\.\.\n(.*)\n")
+    JAVA_IS_VERSION = re.compile(r"Java is version (\S+),")
+    JAVA_VERSION = re.compile(r"Java Version: (\S+),")
+    MINECRAFT_FOLDER = re.compile(r"Minecraft folder is:\n(.*)\n")
+    PARAMS = re.compile(r"Params:\n(.*?)\n", re.DOTALL)
+    VERSION_PARAM = re.compile(r"--version (\S+)\s")
+    FABRIC_LOADING = re.compile(r"Loading Minecraft (\S+) with Fabric Loader(?: (\S+))?")
+    MINECRAFT_VERSION_ID = re.compile(r"Minecraft Version ID: (\S+)")
+    FABRIC_LOADER_JAR = re.compile(r"libraries/net/fabricmc/fabric-loader/\S+/fabric-loader-(\S+).jar")
+    MAIN_CLASS = re.compile(r"Main Class:\n(.*)\n")
+    CLIENT_BRAND = re.compile(r"Client brand changed to '(\S+)'")
+    JAVA_ARGUMENTS = re.compile(r"Java Arguments:\n(.*?)\n", re.DOTALL)
+    JVM_FLAGS = re.compile(r"JVM Flags: \S+ total; (.*(?:\n|$))", re.DOTALL)
+    XMX = [
+        (re.compile(r"-Xmx(\d+)m"), 1),
+        (re.compile(r"-Xmx(\d+)M"), 1),
+        (re.compile(r"-Xmx(\d+)G"), 1024)
+    ]
+
+HEADER_FIELDS = [
+    ("Minecraft folder is:", "minecraft_folder"),
+    ("Checking Java version...", "java_check"),
+    ("Java Arguments:", "java_arguments"),
+    ("Main Class:", "main_class"),
+    ("Params:", "params")
+]
+
+def archive_score(name: str) -> int:
+    name = name.lower().rsplit("/", 1)[-1]
+    if name.startswith("crash-") and name.endswith(".txt"): return 4
+    if name.startswith("hs_err_pid") and name.endswith(".log"): return 3
+    if name == "latest.log": return 2
+    if name.endswith((".log", ".txt")): return 1
+    return 0
+
+def open_member(data: bytes, filename: str) -> io.BufferedIOBase:
+    if filename.endswith(".zip"):
+        archive = zipfile.ZipFile(io.BytesIO(data))
+        members = [(archive_score(member.filename), member.date_time, member) for member in archive.infolist() if not member.is_dir()]
+    else:
+        archive = tarfile.open(fileobj=io.BytesIO(data), mode="r:gz")
+        members = []
+        member = archive.next()
+        while not member is None and member.offset_data <= MAX_DECOMPRESSED_SIZE:
+            if member.isfile(): members.append((archive_score(member.name), member.mtime, member))
+            # getting to the next member decompresses this one, only the start of it is read otherwise
+            if member.offset_data + member.size > MAX_DECOMPRESSED_SIZE: break
+            member = archive.next()
+    if len(members) == 0: return None
+    # the newest of the best named members
+    best = max(members, key=lambda member: member[:2])
+    if best[0] == 0: return None
+    return archive.open(best[2]) if isinstance(archive, zipfile.ZipFile) else archive.extractfile(best[2])
+
+async def inflate(data: bytes):
+    decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+    for start in range(0, len(data), CHUNK_SIZE):
+        data_left = data[start:start + CHUNK_SIZE]
+        # max_length keeps a single chunk from expanding into gigabytes at once
+        while len(data_left) > 0:
+            yield decompressor.decompress(data_left, CHUNK_SIZE)
+            data_left = decompressor.unconsumed_tail
+        if decompressor.eof: return
+
+async def read_file(file: io.BufferedIOBase):
+    while True:
+        chunk = await asyncio.to_thread(file.read, CHUNK_SIZE)
+        if len(chunk) == 0: return
+        yield chunk
+
+@functools.lru_cache(maxsize=None)
+def fold(needle: str) -> str:
+    return needle.lower()
+
 class Log:
-    def __init__(self, content: str) -> None:
+    def __init__(self, content: str, truncated: bool=False) -> None:
         self._content = content
-        self._lower_content = self._content.lower()
+        self.truncated = truncated
+        self._offsets: dict[str, int] = {}
+        self._section_offsets: dict[tuple[str, Section], int] = {}
         self.launchers = [
             "MultiMC",
             "Prism",
@@ -26,34 +126,167 @@ class Log:
         ]
     
     @staticmethod
-    def from_link(link: str):
+    async def from_link(link: str, session: aiohttp.ClientSession):
         paste_ee_match = re.search(r"https://paste\.ee/(?:p/|d/)([a-zA-Z0-9]+)", link)
         mclogs_match = re.search(r"https://mclo\.gs/(\w+)", link)
         if paste_ee_match: link = f"https://paste.ee/d/{paste_ee_match.group(1)}/0"
         elif mclogs_match: link = f"https://api.mclo.gs/1/raw/{mclogs_match.group(1)}"
         elif not link.endswith(".txt") and not link.endswith(".log"): return None
-        res = requests.get(link, timeout=5)
-        if res.status_code == 200:
-            return Log(res.text.replace("\r", ""))
+        return await Log.from_url(link, session)
+
+    @staticmethod
+    async def from_url(link: str, session: aiohttp.ClientSession):
+        try:
+            async with session.get(link) as res:
+                if res.status == 200:
+                    return await Log.from_stream(res.content.iter_chunked(CHUNK_SIZE), res.charset or "utf-8")
+        except (aiohttp.ClientError, asyncio.TimeoutError): pass
         return None
 
+    @staticmethod
+    async def from_bytes(data: bytes, encoding: str="utf-8"):
+        async def chunks():
+            for start in range(0, len(data), CHUNK_SIZE): yield data[start:start + CHUNK_SIZE]
+        return await Log.from_stream(chunks(), encoding)
+
+    @staticmethod
+    async def from_archive(data: bytes, filename: str):
+        """Reads a gzipped log, or the member of a zip or tarball most likely to hold the crash."""
+        filename = filename.lower()
+        try:
+            if filename.endswith((".tar.gz", ".tgz", ".zip")):
+                file = await asyncio.to_thread(open_member, data, filename)
+                if file is None: return None
+                return await Log.from_limited(read_file(file))
+            if filename.endswith(".gz"): return await Log.from_limited(inflate(data))
+        except (tarfile.TarError, zipfile.BadZipFile, zlib.error, EOFError, OSError): pass
+        return None
+
+    @staticmethod
+    async def from_limited(chunks: AsyncIterator[bytes], max_size: int=MAX_DECOMPRESSED_SIZE):
+        """Like from_stream, but stops reading after max_size bytes and marks the log as truncated if it did."""
+        read = 0
+        async def limited():
+            nonlocal read
+            async for chunk in chunks:
+                if read >= max_size:
+                    # a chunk that isn't empty after the cap means there was more, even if the cap fell between chunks
+                    if len(chunk) == 0: continue
+                    read += len(chunk)
+                    break
+                yield chunk[:max_size - read]
+                read += len(chunk)
+        log = await Log.from_stream(limited())
+        if read > max_size: log.truncated = True
+        return log
+
+    @staticmethod
+    async def from_stream(chunks: AsyncIterator[bytes], encoding: str="utf-8", max_size: int=MAX_LOG_SIZE, head_size: int=HEAD_SIZE):
+        """
+        Decodes a log while it downloads. If it's longer than max_size characters, only the first head_size
+        characters (launcher info) and the rest of max_size from the end (where crashes are) are kept.
+        """
+        try: decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        except LookupError: decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        tail_size = max_size - head_size
+        head, tail = [], deque()
+        head_length, tail_length = 0, 0
+        truncated = False
+        final = False
+        chunks = chunks.__aiter__()
+        while not final:
+            try: text = decoder.decode(await chunks.__anext__())
+            except StopAsyncIteration:
+                text = decoder.decode(b"", final=True)
+                final = True
+            text = text.replace("\r", "")
+            if head_length < head_size:
+                head.append(text[:head_size - head_length])
+                head_length += len(head[-1])
+                text = text[len(head[-1]):]
+            if len(text) == 0: continue
+            tail.append(text)
+            tail_length += len(text)
+            while tail_length > tail_size:
+                truncated = True
+                overflow = tail_length - tail_size
+                if len(tail[0]) <= overflow: tail_length -= len(tail.popleft())
+                else:
+                    tail[0] = tail[0][overflow:]
+                    tail_length -= overflow
+        if not truncated: return Log("".join(head) + "".join(tail))
+        # only keep whole lines on both sides of the cut
+        head_content = "".join(head)
+        tail_content = "".join(tail)
+        return Log(head_content[:head_content.rfind("\n") + 1] + tail_content[tail_content.find("\n") + 1:], truncated=True)
+
+    @cached_property
+    def header(self) -> dict[str, str]:
+        """Walks the MultiMC/Prism preamble once, up to the first line of game output."""
+        fields = {}
+        if not self.is_multimc_or_fork: return fields
+        pending = None
+        start = 0
+        # the preamble ends at the first line of game output, logs without any only have it in their head
+        match = Patterns.FIRST_GAME_OUTPUT.search(self._content, 0, HEAD_SIZE)
+        limit = match.start() if not match is None else HEAD_SIZE
+        while True:
+            end = self._content.find("\n", start, limit)
+            if end == -1: break
+            line = self._content[start:end]
+            if not pending is None:
+                fields.setdefault(pending, line)
+                pending = None
+            for label, key in HEADER_FIELDS:
+                if line.endswith(label) and not key in fields:
+                    pending = key
+                    break
+            start = end + 1
+        fields["end"] = start
+        return fields
+
+    @cached_property
+    def sections(self) -> dict[Section, tuple[int, int]]:
+        """
+        Where each part of the log starts and ends: the launcher header up to the first line of game output,
+        the game output, and the crash report and hs_err dump that follow it. Parts that aren't in the log are left out.
+        """
+        length = len(self._content)
+        sections = {}
+        crash_report, hs_err = (self.find_content(marker) for marker in SECTION_MARKERS)
+        if crash_report != -1: sections[Section.CRASH_REPORT] = (crash_report, length)
+        if hs_err != -1: sections[Section.HS_ERR] = (hs_err, length)
+        output_end = min([offset for offset in [crash_report, hs_err] if offset != -1], default=length)
+        match = Patterns.FIRST_GAME_OUTPUT.search(self._content, 0, output_end)
+        if match is None:
+            # without timestamps there's no telling where the header ends, so both get everything before the crash
+            sections[Section.HEADER] = (0, output_end)
+            sections[Section.GAME_OUTPUT] = (0, output_end)
+        else:
+            if match.start() > 0: sections[Section.HEADER] = (0, match.start())
+            sections[Section.GAME_OUTPUT] = (match.start(), output_end)
+        return sections
+
+    def header_field(self, key: str, pattern: re.Pattern) -> str:
+        if self.is_multimc_or_fork: return self.header.get(key)
+        match = pattern.search(self._content)
+        return match.group(1) if not match is None else None
+
     @cached_property
     def mods(self) -> list[str]:
-        pattern = re.compile(r"\[✔️\]\s+([^\[\]]+\.jar)")
-        mods = pattern.findall(self._content)
-        pattern = re.compile(r"\[✔\]\s+([^\[\]\n]+)")
-        mods += [mod.rstrip("\n").replace(" ", "+") + ".jar" for mod in pattern.findall(self._content)]
+        end = self.header.get("end", len(self._content))
+        mods = Patterns.MODS.findall(self._content, 0, end)
+        mods += [mod.rstrip("\n").replace(" ", "+") + ".jar" for mod in Patterns.PRISM_MODS.findall(self._content, 0, end)]
         return mods
     
     @cached_property
     def java_version(self) -> str:
-        match = re.compile(r"Checking Java version\.\.\.\n(.*)\n").search(self._content)
-        if not match is None:
-            line = match.group(1)
-            version_match = re.compile(r"Java is version (\S+),").search(line)
+        line = self.header_field("java_check", Patterns.JAVA_CHECK)
+        if not line is None:
+            version_match = Patterns.JAVA_IS_VERSION.search(line)
             if not version_match is None:
                 return version_match.group(1)
-        version_match = re.compile(r"Java Version: (\S+),").search(self._content)
+        version_match = Patterns.JAVA_VERSION.search(self._content)
         if not version_match is None:
             return version_match.group(1)
         return None
@@ -70,8 +303,8 @@ class Log:
     
     @cached_property
     def minecraft_folder(self) -> str:
-        match = re.compile(r"Minecraft folder is:\n(.*)\n").search(self._content)
-        return match.group(1).strip() if not match is None else None
+        folder = self.header_field("minecraft_folder", Patterns.MINECRAFT_FOLDER)
+        return folder.strip() if not folder is None else None
     
     @cached_property
     def operating_system(self) -> OperatingSystem:
@@ -83,18 +316,20 @@ class Log:
             return OperatingSystem.LINUX
         return OperatingSystem.WINDOWS
     
+    @cached_property
+    def fabric_loading(self) -> re.Match:
+        return Patterns.FABRIC_LOADING.search(self._content)
+
     @cached_property
     def minecraft_version(self) -> str:
-        match = re.compile(r"Params:\n(.*?)\n", re.DOTALL).search(self._content)
-        if not match is None:
-            line = match.group(1)
-            version_match = re.compile(r"--version (\S+)\s").search(line)
+        line = self.header_field("params", Patterns.PARAMS)
+        if not line is None:
+            version_match = Patterns.VERSION_PARAM.search(line)
             if not version_match is None:
                 return version_match.group(1)
-        match = re.compile(r"Loading Minecraft (\S+) with Fabric Loader").search(self._content)
-        if not match is None:
-            return match.group(1)
-        match = re.compile(r"Minecraft Version ID: (\S+)").search(self._content)
+        if not self.fabric_loading is None:
+            return self.fabric_loading.group(1)
+        match = Patterns.MINECRAFT_VERSION_ID.search(self._content)
         if not match is None:
             return match.group(1)
         return None
@@ -107,11 +342,11 @@ class Log:
     
     @cached_property
     def fabric_version(self) -> version.Version:
-        match = re.compile(r"Loading Minecraft \S+ with Fabric Loader (\S+)").search(self._content)
         try:
-            if not match is None: return version.parse(match.group(1))
+            if not self.fabric_loading is None and not self.fabric_loading.group(2) is None:
+                return version.parse(self.fabric_loading.group(2))
         except: pass
-        match = re.compile(r"libraries/net/fabricmc/fabric-loader/\S+/fabric-loader-(\S+).jar").search(self._content)
+        match = Patterns.FABRIC_LOADER_JAR.search(self._content)
         try:
             if not match is None: return version.parse(match.group(1))
         except: pass
@@ -119,7 +354,8 @@ class Log:
     
     @cached_property
     def launcher(self) -> str:
-        result = self._content.split(" ", 1)[0]
+        end = self._content.find(" ")
+        result = self._content[:end] if end != -1 else self._content
         return result if result in self.launchers else None
 
     @cached_property
@@ -132,9 +368,8 @@ class Log:
     
     @cached_property
     def mod_loader(self) -> ModLoader:
-        match = re.compile(r"Main Class:\n(.*)\n").search(self._content)
-        if not match is None:
-            line = match.group(1)
+        line = self.header_field("main_class", Patterns.MAIN_CLASS)
+        if not line is None:
             for loader in ModLoader:
                 if loader.value.lower() in line.lower():
                     return loader
@@ -142,10 +377,9 @@ class Log:
                 return ModLoader.FORGE
             if "net.minecraft.client.main.Main" in line:
                 return ModLoader.VANILLA
-        match = re.search(r"Loading Minecraft \S+ with Fabric Loader",self._content)
-        if not match is None:
+        if not self.fabric_loading is None:
             return ModLoader.FABRIC
-        match = re.search(r"Client brand changed to '(\S+)'",self._content)
+        match = Patterns.CLIENT_BRAND.search(self._content)
         if match:
             for loader in ModLoader:
                 if loader.value.lower() in match.group(1).lower():
@@ -156,10 +390,10 @@ class Log:
     
     @cached_property
     def java_arguments(self):
-        match = re.compile(r"Java Arguments:\n(.*?)\n", re.DOTALL).search(self._content)
-        if not match is None:
-            return match.group(1)
-        match = re.compile(r"JVM Flags: \S+ total; (.*(?:\n|$))", re.DOTALL).search(self._content)
+        line = self.header_field("java_arguments", Patterns.JAVA_ARGUMENTS)
+        if not line is None:
+            return line
+        match = Patterns.JVM_FLAGS.search(self._content)
         if not match is None:
             return match.group(1)
         return None
@@ -167,22 +401,93 @@ class Log:
     @cached_property
     def max_allocated(self):
         if not self.java_arguments is None:
-            match = re.compile(r"-Xmx(\d+)m").search(self.java_arguments)
-            try:
-                if not match is None: return int(match.group(1))
-            except ValueError: pass
-            match = re.compile(r"-Xmx(\d+)M").search(self.java_arguments)
-            try:
-                if not match is None: return int(match.group(1))
-            except ValueError: pass
-            match = re.compile(r"-Xmx(\d+)G").search(self.java_arguments)
-            try:
-                if not match is None: return int(match.group(1))*1024
-            except ValueError: pass
+            for pattern, factor in Patterns.XMX:
+                match = pattern.search(self.java_arguments)
+                try:
+                    if not match is None: return int(match.group(1)) * factor
+                except ValueError: pass
         return None
     
-    def has_content(self, content: str) -> bool:
-        return content.lower() in self._lower_content
+    @property
+    def hits(self) -> dict[str, int]:
+        return {needle: offset for needle, offset in self._offsets.items() if offset != -1}
+
+    def find_content(self, content: str) -> int:
+        # every needle is searched for at most once per log, repeated checks are a dict lookup
+        needle = fold(content)
+        offset = self._offsets.get(needle)
+        if offset is None:
+            self._scan([needle])
+            offset = self._offsets[needle]
+        return offset
+
+    def scan(self, needles: list[str]):
+        """Searches for several needles in a single pass, has_content is a dict lookup for them afterwards."""
+        pending = list(dict.fromkeys(needle for needle in map(fold, needles) if not needle in self._offsets))
+        if len(pending) > 0: self._scan(pending)
+
+    def _scan(self, needles: list[str]):
+        # lowercases the log one window at a time instead of keeping a lowercase copy of all of it,
+        # windows overlap so needles that cross a window boundary are still found
+        overlap = max(len(needle) for needle in needles) - 1
+        for start in range(0, max(len(self._content), 1), WINDOW_SIZE):
+            window = self._content[start:start + WINDOW_SIZE + overlap].lower()
+            remaining = []
+            for needle in needles:
+                offset = window.find(needle)
+                if offset == -1: remaining.append(needle)
+                else: self._offsets[needle] = start + offset
+            needles = remaining
+            if len(needles) == 0: return
+        for needle in needles: self._offsets[needle] = -1
+
+    def find_in_lines(self, needles: list[str], start: int=0, end: int=None) -> set[str]:
+        """
+        Returns which of the lowercase needles, none of which may contain a line break, are between start and end.
+        Every distinct line is only searched once, so a stacktrace that repeats the same frames thousands of times is cheap.
+        """
+        end = len(self._content) if end is None else end
+        found = set()
+        seen = set()
+        position = start
+        while position < end and len(needles) > 0:
+            window_end = self._content.find("\n", min(position + WINDOW_SIZE, end), end)
+            window_end = end if window_end == -1 else window_end + 1
+            lines = [line for line in dict.fromkeys(self._content[position:window_end].lower().split("\n")) if not line in seen]
+            # a stacktrace with this many distinct lines doesn't repeat much, and remembering more would cost more than a copy
+            if len(seen) < 16384: seen.update(lines)
+            text = "\n".join(lines)
+            remaining = []
+            for needle in needles:
+                if needle in text: found.add(needle)
+                else: remaining.append(needle)
+            needles = remaining
+            position = window_end
+        return found
+
+    def find_in_section(self, needle: str, section: Section) -> int:
+        bounds = self.sections.get(section)
+        if bounds is None: return -1
+        start, end = bounds
+        key = (needle, section)
+        offset = self._section_offsets.get(key)
+        if offset is None:
+            # the first match in the whole log answers it without a search, unless it's before the section
+            offset = self._offsets.get(needle)
+            if offset is None or (offset != -1 and offset < start): offset = self._find_between(needle, start, end)
+            elif offset != -1 and offset + len(needle) > end: offset = -1
+            self._section_offsets[key] = offset
+        return offset
+
+    def _find_between(self, needle: str, start: int, end: int) -> int:
+        for window_start in range(start, max(end, start + 1), WINDOW_SIZE):
+            offset = self._content[window_start:min(window_start + WINDOW_SIZE + len(needle) - 1, end)].lower().find(needle)
+            if offset != -1: return window_start + offset
+        return -1
+
+    def has_content(self, content: str, section: Section=None) -> bool:
+        if not section is None: return self.find_in_section(fold(content), section) != -1
+        return self.find_content(content) != -1
     
     def has_mod(self, mod_name: str) -> bool:
         for mod in self.mods:
@@ -193,18 +498,5 @@ class Log:
     def has_java_argument(self, argument: str) -> bool:
         return argument.lower() in self.java_arguments.lower()
     
-    def upload(self) -> (bool, str):
-        api_url = "https://api.mclo.gs/1/log"
-        payload = {
-            "content": self._content
-        }
-        response = requests.post(api_url, data=payload)
-        if response.status_code == 200:
-            match = re.search(r"/(Users|home)/([^/]+)/", self._content)
-            return (
-                match and match.group(2).lower() not in ["user", "admin", "********"],
-                response.json().get("url")
-            )
-    
     def __str__(self) -> str:
         return f"mods={self.mods}\njava_version={self.java_version}\nmajor_java_version={self.major_java_version}\nminecraft_folder={self.minecraft_folder}\noperating_system={self.operating_system}\nminecraft_version={self.minecraft_version}\nfabric_version={self.fabric_version}\nlauncher={self.launcher}\ncustom_launcher={self.custom_launcher}\nmod_loader={self.mod_loader}\njava_arguments={self.java_arguments}\nmax_allocated={self.max_allocated}"
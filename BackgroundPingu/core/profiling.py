@@ -0,0 +1,53 @@
+import sys, time, importlib.abc
+
+class TimedLoader(importlib.abc.Loader):
+    def __init__(self, loader, profiler: "ImportProfiler") -> None:
+        self.loader = loader
+        self.profiler = profiler
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        # the time spent in imports a module makes is added to the top of the stack, to get its own time out of its total
+        stack = self.profiler._stack
+        stack.append(0)
+        start = time.perf_counter()
+        try: self.loader.exec_module(module)
+        finally:
+            total = time.perf_counter() - start
+            children = stack.pop()
+            if len(stack) > 0: stack[-1] += total
+            self.profiler.times[module.__name__] = (total, total - children)
+
+    def __getattr__(self, name: str):
+        return getattr(self.loader, name)
+
+class ImportProfiler(importlib.abc.MetaPathFinder):
+    """Times how long every module imported while it's installed takes to execute, with and without its own imports."""
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.times: dict[str, tuple[float, float]] = {}
+        self._stack: list[float] = []
+
+    def find_spec(self, name: str, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"): continue
+            spec = finder.find_spec(name, path, target)
+            if not spec is None: break
+        else: return None
+        if not spec.loader is None and hasattr(spec.loader, "exec_module"): spec.loader = TimedLoader(spec.loader, self)
+        return spec
+
+    def report(self, amount: int=25) -> str:
+        lines = [f"{'module':<60} {'self ms':>8} {'total ms':>9}"]
+        for name, (total, own) in sorted(self.times.items(), key=lambda item: item[1][1], reverse=True)[:amount]:
+            lines.append(f"{name:<60} {own * 1000:>8.1f} {total * 1000:>9.1f}")
+        return "\n".join(lines)
+
+profiler: ImportProfiler = None
+
+def start():
+    global profiler
+    profiler = ImportProfiler()
+    sys.meta_path.insert(0, profiler)
@@ -0,0 +1,127 @@
+import asyncio, time, math
+from collections import OrderedDict, deque
+
+class RateLimited(Exception):
+    pass
+
+class Job:
+    def __init__(self, function, guild_id: int, user_id: int, message_id: int, priority: bool) -> None:
+        self.function = function
+        self.guild_id = guild_id
+        self.user_id = user_id
+        self.message_id = message_id
+        self.priority = priority
+        self.created = time.monotonic()
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+class Scheduler:
+    """
+    Bounded job queue in front of log analysis. Guilds take turns, so one busy server can't hold up the others,
+    and priority jobs (the Check Log command) go before passive scans.
+    """
+    def __init__(self, concurrency: int, size: int=256, user_limit: int=5, user_period: float=60, window: int=1000) -> None:
+        self.concurrency = concurrency
+        self.size = size
+        self.user_limit = user_limit
+        self.user_period = user_period
+        self._queues: list[OrderedDict[int, deque[Job]]] = [OrderedDict(), OrderedDict()]
+        self._jobs: dict[int, list[Job]] = {}
+        self._users: dict[int, deque[float]] = {}
+        self._available: asyncio.Semaphore = None
+        self._tasks: list[asyncio.Task] = []
+        self.depth = 0
+        self.running = 0
+        self.rejected = 0
+        self.rate_limited = 0
+        self.cancelled = 0
+        self.waits: deque[float] = deque(maxlen=window)
+
+    def start(self):
+        self._available = asyncio.Semaphore(0)
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.concurrency)]
+
+    def stop(self):
+        for task in self._tasks: task.cancel()
+        self._tasks = []
+
+    def _check_rate_limit(self, user_id: int):
+        now = time.monotonic()
+        times = self._users.setdefault(user_id, deque())
+        while len(times) > 0 and now - times[0] > self.user_period: times.popleft()
+        if len(times) >= self.user_limit:
+            self.rate_limited += 1
+            raise RateLimited()
+        times.append(now)
+        if len(self._users) > 10000:
+            for user in [user for user, user_times in self._users.items() if len(user_times) == 0 or now - user_times[-1] > self.user_period]: del self._users[user]
+
+    async def submit(self, function, guild_id: int, user_id: int, message_id: int, priority: bool=False):
+        """Runs function() once it's this job's turn and returns its result. Raises asyncio.QueueFull, RateLimited or asyncio.CancelledError."""
+        if self.depth >= self.size:
+            self.rejected += 1
+            raise asyncio.QueueFull()
+        self._check_rate_limit(user_id)
+        job = Job(function, guild_id, user_id, message_id, priority)
+        queue = self._queues[0 if priority else 1]
+        if not guild_id in queue: queue[guild_id] = deque()
+        queue[guild_id].append(job)
+        self._jobs.setdefault(message_id, []).append(job)
+        self.depth += 1
+        self._available.release()
+        return await job.future
+
+    def cancel(self, message_id: int):
+        """Drops the queued jobs of a message, jobs that already started keep running."""
+        for job in self._jobs.pop(message_id, []):
+            queue = self._queues[0 if job.priority else 1]
+            jobs = queue.get(job.guild_id)
+            if not jobs is None and job in jobs:
+                jobs.remove(job)
+                if len(jobs) == 0: del queue[job.guild_id]
+                self.depth -= 1
+                self.cancelled += 1
+                job.future.cancel()
+
+    def _next(self) -> Job:
+        for queue in self._queues:
+            if len(queue) > 0:
+                guild_id, jobs = queue.popitem(last=False)
+                job = jobs.popleft()
+                # the guild goes to the back of the line if it has more jobs
+                if len(jobs) > 0: queue[guild_id] = jobs
+                return job
+        return None
+
+    async def _work(self):
+        while True:
+            await self._available.acquire()
+            job = self._next()
+            # cancelled jobs leave a release behind without a job
+            if job is None: continue
+            self.depth -= 1
+            jobs = self._jobs.get(job.message_id, [])
+            if job in jobs: jobs.remove(job)
+            if len(jobs) == 0: self._jobs.pop(job.message_id, None)
+            if job.future.done(): continue
+            self.waits.append(time.monotonic() - job.created)
+            self.running += 1
+            try: job.future.set_result(await job.function())
+            except asyncio.CancelledError:
+                # only stopping the scheduler ends a worker, anything else that cancels a job fails just that job
+                if asyncio.current_task().cancelling() > 0:
+                    job.future.cancel()
+                    raise
+                job.future.set_exception(RuntimeError("The job was cancelled while it ran."))
+            except Exception as e: job.future.set_exception(e)
+            finally: self.running -= 1
+
+    def wait_percentile(self, percent: float) -> float:
+        waits = sorted(self.waits)
+        if len(waits) == 0: return 0
+        return waits[max(math.ceil(len(waits) * percent / 100) - 1, 0)]
+
+    def guild_depths(self) -> dict[int, int]:
+        depths = {}
+        for queue in self._queues:
+            for guild_id, jobs in queue.items(): depths[guild_id] = depths.get(guild_id, 0) + len(jobs)
+        return depths
@@ -0,0 +1,97 @@
+import asyncio, argparse
+from aiohttp import web
+from BackgroundPingu.core import http, workers
+from BackgroundPingu.core.parser import Log, CHUNK_SIZE
+from BackgroundPingu.data import compiled
+
+class Service:
+    """Checks logs over http, standing in for the bot wherever the analysis code expects one."""
+    def __init__(self, processes: int=None, in_flight: int=None, queue_size: int=64) -> None:
+        self.load_data()
+        self.session = None
+        self.workers = workers.AnalysisPool(self, processes)
+        # twice the processes by default, so reading the next bodies overlaps with checking
+        self.in_flight = in_flight or self.workers.workers * 2
+        self.queue_size = queue_size
+        self.checking = 0
+        self.queued = 0
+        self.rejected = 0
+        self._semaphore = asyncio.Semaphore(self.in_flight)
+
+    def load_data(self):
+        self.data_version, strings, mods = compiled.read_files()
+        self.strings, self.mods, self.catalogue = compiled.get(self.data_version, strings, mods)
+
+    async def get_log(self, request: web.Request) -> Log:
+        if request.content_type == "application/json":
+            data = await request.json()
+            if not isinstance(data, dict): raise ValueError("Expected a json object.")
+            if "link" in data:
+                if not isinstance(data["link"], str): raise ValueError("Expected link to be a string.")
+                return await Log.from_link(data["link"], self.session)
+            content = data.get("content", "")
+            if not isinstance(content, str): raise ValueError("Expected content to be a string.")
+            return Log(content.replace("\r", ""))
+        return await Log.from_stream(request.content.iter_chunked(CHUNK_SIZE), request.charset or "utf-8")
+
+    async def check(self, request: web.Request) -> web.Response:
+        # the semaphore bounds the logs being checked, the queue how many requests may wait for it
+        if self._semaphore.locked() and self.queued >= self.queue_size:
+            self.rejected += 1
+            return web.json_response({"error": "too many requests"}, status=429, headers={"Retry-After": "1"})
+        self.queued += 1
+        try: await self._semaphore.acquire()
+        finally: self.queued -= 1
+        self.checking += 1
+        try:
+            try: log = await self.get_log(request)
+            except ValueError as e: return web.json_response({"error": str(e)}, status=400)
+            if log is None: return web.json_response({"error": "couldn't get a log from the link"}, status=422)
+            builder = await self.workers.check(log)
+        finally:
+            self.checking -= 1
+            self._semaphore.release()
+        return web.json_response({
+            "issues": builder.keys,
+            "messages": builder._messages,
+            "amount": builder.amount,
+            "truncated": log.truncated
+        })
+
+    async def health(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            "checking": self.checking,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "cache_entries": len(self.workers.cache),
+            "cache_hits": self.workers.cache.hits,
+            "cache_misses": self.workers.cache.misses,
+            "data_version": self.data_version
+        })
+
+    async def on_startup(self, app: web.Application):
+        self.session = http.create_session()
+        self.workers.start()
+
+    async def on_cleanup(self, app: web.Application):
+        await self.session.close()
+        self.workers.shutdown()
+
+    def create_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/check", self.check)
+        app.router.add_get("/health", self.health)
+        app.on_startup.append(self.on_startup)
+        app.on_cleanup.append(self.on_cleanup)
+        return app
+
+def main():
+    arguments = argparse.ArgumentParser(description="Serves log checks over http. POST a raw log, or json with a link or content, to /check.")
+    arguments.add_argument("--host", default="127.0.0.1")
+    arguments.add_argument("--port", type=int, default=8080)
+    arguments.add_argument("-p", "--processes", type=int, help="worker processes, defaults to the number of cpus")
+    arguments.add_argument("--in-flight", type=int, help="logs checked at once, defaults to twice the number of processes")
+    arguments.add_argument("--queue", type=int, default=64, help="requests that may wait before getting 429")
+    args = arguments.parse_args()
+    service = Service(args.processes, args.in_flight, args.queue)
+    web.run_app(service.create_app(), host=args.host, port=args.port, keepalive_timeout=75)
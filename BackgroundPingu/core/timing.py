@@ -0,0 +1,48 @@
+import math
+from collections import deque
+
+class RuleTimings:
+    """Running totals of how long each checker rule took, with a window of recent durations for percentiles."""
+    def __init__(self, window: int=1000) -> None:
+        self.window = window
+        self.checks = 0
+        self._counts: dict[str, int] = {}
+        self._skips: dict[str, int] = {}
+        self._totals: dict[str, float] = {}
+        self._recent: dict[str, deque[float]] = {}
+
+    def _add(self, name: str):
+        if not name in self._counts:
+            self._counts[name] = 0
+            self._skips[name] = 0
+            self._totals[name] = 0
+            self._recent[name] = deque(maxlen=self.window)
+
+    def record(self, timings: dict[str, float], skipped: list[str]=[]):
+        self.checks += 1
+        for name in skipped:
+            self._add(name)
+            self._skips[name] += 1
+        for name, duration in timings.items():
+            self._add(name)
+            self._counts[name] += 1
+            self._totals[name] += duration
+            self._recent[name].append(duration)
+
+    def percentile(self, name: str, percent: float) -> float:
+        durations = sorted(self._recent[name])
+        if len(durations) == 0: return 0
+        return durations[max(math.ceil(len(durations) * percent / 100) - 1, 0)]
+
+    def summary(self, name: str) -> dict:
+        return {
+            "name": name,
+            "count": self._counts[name],
+            "skipped": self._skips[name],
+            "total": self._totals[name],
+            "p50": self.percentile(name, 50),
+            "p99": self.percentile(name, 99)
+        }
+
+    def slowest(self, amount: int=10, key: str="total") -> list[dict]:
+        return sorted([self.summary(name) for name in self._counts], key=lambda summary: summary[key], reverse=True)[:amount]
@@ -0,0 +1,42 @@
+import asyncio, aiohttp
+from typing import TYPE_CHECKING
+from BackgroundPingu.core.cache import ResultCache
+
+if TYPE_CHECKING:
+    from BackgroundPingu.core.parser import Log
+
+API_URL = "https://api.mclo.gs/1/log"
+TIMEOUT = aiohttp.ClientTimeout(total=8)
+ATTEMPTS = 3
+BACKOFF = 1
+
+class Uploader:
+    """Uploads logs to mclo.gs, at most once per log content."""
+    def __init__(self, bot) -> None:
+        self.bot = bot
+        self.urls = ResultCache(size=1024, ttl=24 * 3600)
+        self._uploading: dict[str, asyncio.Task] = {}
+
+    async def upload(self, log: "Log") -> str:
+        """Returns the url of the uploaded log, or None if mclo.gs couldn't be reached."""
+        key = await asyncio.to_thread(self.urls.key, log._content)
+        url = self.urls.get(key)
+        if not url is None: return url
+        # clicks on two copies of the same log wait for one upload
+        task = self._uploading.get(key)
+        if task is None:
+            task = self._uploading[key] = asyncio.create_task(self._upload(log._content))
+            task.add_done_callback(lambda _: self._uploading.pop(key, None))
+        url = await asyncio.shield(task)
+        if not url is None: self.urls.put(key, url)
+        return url
+
+    async def _upload(self, content: str) -> str:
+        for attempt in range(ATTEMPTS):
+            if attempt > 0: await asyncio.sleep(BACKOFF * 2 ** (attempt - 1))
+            try:
+                async with self.bot.session.post(API_URL, data={"content": content}, timeout=TIMEOUT) as res:
+                    if res.status == 200: return (await res.json()).get("url")
+                    if res.status < 500 and res.status != 429: return None
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError): pass
+        return None
@@ -0,0 +1,82 @@
+import asyncio, os, pickle, multiprocessing
+from typing import TYPE_CHECKING
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from BackgroundPingu.core.cache import ResultCache
+from BackgroundPingu.core.timing import RuleTimings
+
+# the analysis code is only imported where logs are checked, so the bot doesn't load it while booting
+if TYPE_CHECKING:
+    from BackgroundPingu.core.parser import Log
+    from BackgroundPingu.core.issues import IssueBuilder
+
+class Snapshot:
+    """Read-only stand-in for the bot inside a worker, holding only what the checker reads from it."""
+    def __init__(self, strings: dict, mods: list, catalogue: bytes=None) -> None:
+        from BackgroundPingu.core.catalogue import Catalogue
+        self.strings = strings
+        self.mods = mods
+        self.catalogue = pickle.loads(catalogue) if not catalogue is None else Catalogue(mods)
+
+_snapshot: Snapshot = None
+
+def _init_worker(strings: dict, mods: list, catalogue: bytes=None):
+    global _snapshot
+    _snapshot = Snapshot(strings, mods, catalogue)
+
+def _check(content: str, truncated: bool) -> tuple[dict, dict[str, float], list[str]]:
+    from BackgroundPingu.core.parser import Log
+    from BackgroundPingu.core.issues import IssueChecker
+    checker = IssueChecker(_snapshot, Log(content, truncated))
+    return checker.check().to_dict(), checker.timings, checker.skipped
+
+class AnalysisPool:
+    def __init__(self, bot, workers: int=None) -> None:
+        self.bot = bot
+        self.workers = workers if not workers is None else os.cpu_count() or 1
+        self._executor: ProcessPoolExecutor = None
+        self.cache = ResultCache()
+        self.timings = RuleTimings()
+
+    def start(self):
+        # spawn instead of fork, forking a process that runs an event loop and gateway threads isn't safe
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.bot.strings, self.bot.mods, self.bot.catalogue)
+        )
+        return self
+
+    def shutdown(self):
+        if not self._executor is None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def restart(self):
+        self.shutdown()
+        return self.start()
+
+    def reload(self):
+        """Call after bot.strings or bot.mods changed, so workers and cached results don't use the old data."""
+        self.cache.clear()
+        if not self._executor is None:
+            # new checks go to new workers, the old ones finish the checks they already have in the background
+            executor = self._executor
+            self.start()
+            executor.shutdown(wait=False)
+
+    async def check(self, log: "Log") -> "IssueBuilder":
+        from BackgroundPingu.core.issues import IssueBuilder
+        key = await asyncio.to_thread(self.cache.key, log._content, self.bot.data_version, log.truncated)
+        data = self.cache.get(key)
+        if data is None:
+            if self._executor is None: self.start()
+            try:
+                data, timings, skipped = await asyncio.get_running_loop().run_in_executor(self._executor, _check, log._content, log.truncated)
+            except BrokenProcessPool:
+                self.restart()
+                raise
+            self.timings.record(timings, skipped)
+            self.cache.put(key, data)
+        return IssueBuilder.from_dict(self.bot, log, data)
@@ -0,0 +1,44 @@
+import os, json, pickle, hashlib
+
+PATH = "./BackgroundPingu/data/compiled.pickle"
+# bump when Catalogue or anything else in the pickle changes shape
+FORMAT = 2
+
+def read_files() -> tuple[str, bytes, bytes]:
+    """Returns the data version with the raw issues.json and mods.json, mods.json may not exist on a first boot without network."""
+    with open("./BackgroundPingu/data/issues.json", "rb") as f:
+        strings = f.read()
+    mods = b"[]"
+    if os.path.exists("./BackgroundPingu/data/mods.json"):
+        with open("./BackgroundPingu/data/mods.json", "rb") as f:
+            mods = f.read()
+    return hashlib.sha1(strings + mods).hexdigest(), strings, mods
+
+def load(data_version: str) -> tuple[dict, list, bytes]:
+    """Returns the strings, mods and pickled catalogue compiled from the same issues.json and mods.json, or None."""
+    try:
+        with open(PATH, "rb") as f:
+            format, version, strings, mods, catalogue = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, ValueError, TypeError, AttributeError, ImportError): return None
+    if format != FORMAT or version != data_version: return None
+    return strings, mods, catalogue
+
+def save(data_version: str, strings: dict, mods: list, catalogue: bytes):
+    # written next to the old file and moved over it, so a crash can't leave half a snapshot
+    with open(PATH + ".tmp", "wb") as f:
+        pickle.dump((FORMAT, data_version, strings, mods, catalogue), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(PATH + ".tmp", PATH)
+
+def get(data_version: str, strings: bytes, mods: bytes) -> tuple[dict, list, bytes]:
+    """
+    The catalogue stays pickled, only the workers that check logs unpickle it,
+    so the bot doesn't import the catalogue or semver unless the data changed.
+    """
+    data = load(data_version)
+    if not data is None: return data
+    from BackgroundPingu.core.catalogue import Catalogue
+    mods = json.loads(mods)
+    data = (json.loads(strings), mods, pickle.dumps(Catalogue(mods), protocol=pickle.HIGHEST_PROTOCOL))
+    try: save(data_version, *data)
+    except OSError as e: print(f"Couldn't save compiled data: {e}")
+    return data
@@ -1,19 +1,21 @@
 import json
 
 def sort():
-    print("Sorting issues...")
     path = "./BackgroundPingu/data/issues.json"
     added_periods = 0
     with open(path, "r") as f:
-        strings = json.load(f)
-        for key, string in strings.items():
-            if not string[len(string) - 1] in [".", "!", "?", "*", ":"]:
-                strings[key] = string + "."
-                added_periods += 1
+        content = f.read()
+    strings = json.loads(content)
+    for key, string in strings.items():
+        if not string[len(string) - 1] in [".", "!", "?", "*", ":"]:
+            strings[key] = string + "."
+            added_periods += 1
+    sorted_content = json.dumps(dict(sorted(strings.items())), indent=4)
+    # rewriting an unchanged file would still touch it for anything watching it
+    if sorted_content != content:
         with open(path, "w") as w:
-            json.dump(dict(sorted(strings.items())), w, indent=4)
-    print(f"  Added {added_periods} period{'s' if not added_periods == 1 else ''}.")
-    print("  Finished sorting issues.")
+            w.write(sorted_content)
+        print(f"Sorted issues, added {added_periods} period{'s' if not added_periods == 1 else ''}.")
 
 if __name__ == "__main__":
     sort()
@@ -1,9 +1,64 @@
-import json, requests
+import json, requests, semver
+from BackgroundPingu.core.catalogue import VersionRanges
 
 ignored = []
 
+def is_version(v: str) -> bool:
+    try: semver.Version.parse(v)
+    except ValueError: return False
+    return True
+
+def get_version_ranges(game_versions: list[str]) -> list[str]:
+    """
+    Turns the space separated version constraints of a file into merged interval notation, like "[1.16.0,1.16.10]" or "(,1.16.5]".
+    Bounded ranges hold the versions a file names explicitly, ranges open on one side only widen what it runs on.
+    """
+    matches = []
+    listed = []
+    for game_version in game_versions:
+        for v in game_version.split(" "):
+            if v.endswith("-"):
+                if v.count(".") != 1 or not is_version(f"{v[:-1]}.0"): continue
+                listed.append(f"[{v[:-1]}.0,{v[:-1]}.10]")
+                continue
+            if v.count(".") == 1: v += ".0"
+            for operator in ["~", "<=", ">=", "==", "!=", "=", "<", ">", ""]:
+                if v.startswith(operator): break
+            ver = v[len(operator):]
+            if not is_version(ver) or (operator == "" and not ver[:1].isdigit()): continue
+            major, minor = ver.split(".")[:2]
+            if operator in ["", "=", "=="]: listed.append(f"[{ver}]")
+            elif operator == "~":
+                matches.append(f"(,{ver}]")
+                listed.append(f"[{ver}]")
+            elif operator == "<=":
+                matches.append(f"(,{ver}]")
+                listed.append(f"[{major}.{minor}.0,{ver}]")
+            elif operator == ">=":
+                matches.append(f"[{ver},)")
+                listed.append(f"[{ver},{major}.{minor}.10]")
+            elif operator == "<": matches.append(f"(,{ver})")
+            elif operator == ">": matches.append(f"({ver},)")
+            elif operator == "!=": matches += [f"(,{ver})", f"({ver},)"]
+    return VersionRanges.from_notation(listed).notation() + VersionRanges.from_notation(matches).notation()
+
+def process_mods(content: list[dict]) -> list[dict]:
+    mods = []
+    for item in content:
+        if item["type"] != "fabric_mod":
+            continue
+        item.pop("type", "")
+        item.pop("description", "")
+        item.pop("recommended", "")
+        for fi in item["files"]:
+            fi.pop("url", "")
+            fi.pop("sha1", "")
+            fi.pop("size", "")
+            fi["game_version_ranges"] = get_version_ranges(fi.pop("game_versions", []))
+        mods.append(item)
+    return mods
+
 def get_mods(start: bool=True):
-    """I hate python semver. If it wasn't for that I wouldn't have to do all this..."""
     if start: print("Getting mods...")
     path = "./BackgroundPingu/data/mods.json"
     mods = []
@@ -11,50 +66,7 @@ def get_mods(start: bool=True):
     if res.status_code == 200:
         content = res.text
         for item in ignored: content = content.replace(item, "")
-        content = json.loads(content)
-        for item in content:
-            if item["type"] != "fabric_mod":
-                continue
-            item.pop("type", "")
-            item.pop("description", "")
-            item.pop("recommended", "")
-            for fi in item["files"]:
-                fi.pop("url", "")
-                fi.pop("sha1", "")
-                fi.pop("size", "")
-                vi = 0
-                for vs in fi["game_versions"]:
-                    parts = vs.split(" ")
-                    final_parts = []
-                    for v in parts:
-                        if v.endswith("-"):
-                            for i in range(11):
-                                final_parts.append(f"{v[:-1]}.{i}")
-                        else:
-                            if v.count(".") == 1:
-                                v += ".0"
-                            try:
-                                if v.startswith("<="):
-                                    for i in range(int(v.split('.')[2])+1):
-                                        final_parts.append(f"{v[:-1]}{i}")
-                                elif v.startswith(">="):
-                                    for i in range(int(v.split('.')[2]),11):
-                                        final_parts.append(f"{v[:-1]}{i}")
-                                else: final_parts.append(v)
-                            except: final_parts.append(v)
-                    pi = 0
-                    for v in final_parts:
-                        if v.count(".") == 1:
-                            v += ".0"
-                        if v.startswith("=1"):
-                            v = v.replace("=1", "==1")
-                        elif v.startswith("~1"):
-                            v = v.replace("~1", "<=1")
-                        final_parts[pi] = v
-                        pi += 1
-                    fi["game_versions"][vi] = " ".join(final_parts)
-                    vi += 1
-            mods.append(item)
+        mods = process_mods(json.loads(content))
         with open(path, "w") as f:
             json.dump(mods, f, indent=4)
     if start: print("  Finished getting mods.")
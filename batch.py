@@ -0,0 +1,4 @@
+from BackgroundPingu.core import batch
+
+if __name__ == "__main__":
+    batch.main()
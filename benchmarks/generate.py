@@ -0,0 +1,164 @@
+import random
+
+LAUNCHERS = ["multimc", "prism", "vanilla"]
+LOADERS = ["fabric", "forge", "vanilla"]
+
+MAIN_CLASSES = {
+    "fabric": "net.fabricmc.loader.impl.launch.knot.KnotClient",
+    "forge": "net.minecraft.launchwrapper.Launch",
+    "vanilla": "net.minecraft.client.main.Main"
+}
+
+BRAND_LINES = {
+    "fabric": "[{time}] [main/INFO]: Loading Minecraft {version} with Fabric Loader 0.14.21\n",
+    "forge": "[{time}] [Client thread/INFO]: Client brand changed to 'forge'\n",
+    "vanilla": "[{time}] [Client thread/INFO]: Client jar signature remains and client brand is untouched.\n"
+}
+
+MODS = [
+    "SpeedRunIGT-13.3+1.16.1.jar",
+    "sodium-1.16.1-v2.jar",
+    "lithium-0.6.6.jar",
+    "starlight-1.0.0.jar",
+    "worldpreview-3.0.jar",
+    "atum-1.1.jar",
+    "lazystronghold-1.1.jar",
+    "antiresourcereload-3.0.jar",
+    "fast-reset-1.4.jar",
+    "voyager-1.0.jar",
+    "standardsettings-1.2.jar",
+    "state-output-1.1.jar",
+    "sleepbackground-3.8-1.8.x-1.12.x.jar",
+    "krypton-0.1.jar",
+    "chunkcacher-1.0.jar",
+    "setspawnmod-1.2.jar",
+    "speedrunapi-1.0.jar",
+    "extra-options-1.0.jar",
+    "tab-focus-1.0.jar",
+    "legacy-planar-fog-1.0.jar"
+]
+
+LINES = [
+    "[{time}] [Render thread/INFO]: [STDOUT]: Reset world, seed {seed} took {ms}ms",
+    "[{time}] [Server thread/INFO]: Saving chunks for level 'ServerLevel[Random Speedrun #{seed}]'/minecraft:overworld",
+    "[{time}] [Render thread/WARN]: Unable to play unknown soundEvent: minecraft:item.armor.equip_{ms}",
+    "[{time}] [Worker-Main-{ms}/INFO]: Preparing spawn area: {ms}%",
+    "[{time}] [Render thread/INFO]: Loaded {ms} advancements"
+]
+
+CRASH_REPORT = """---- Minecraft Crash Report ----
+// Who set us up the TNT?
+
+Time: 1/1/24 12:00 PM
+Description: Unexpected error
+
+java.lang.NullPointerException: Cannot invoke "net.minecraft.class_2680.method_26213()" because "state" is null
+\tat net.minecraft.class_1937.method_8320(class_1937.java:321)
+\tat me.voidxwalker.worldpreview.mixin.client.render.WorldRendererMixin.render(WorldRendererMixin.java:54)
+\tat com.redlimerl.speedrunigt.timer.InGameTimer.tick(InGameTimer.java:412)
+\tat net.minecraft.client.MinecraftClient.run(MinecraftClient.java:719)
+
+A detailed walkthrough of the error, its code path and all known details is as follows:
+---------------------------------------------------------------------------------------
+
+-- System Details --
+\tMinecraft Version ID: {version}
+\tJava Version: 17.0.2, Oracle Corporation
+\tJVM Flags: 2 total; -Xms512m -Xmx2048m
+"""
+
+ANTICHEAT = """[{time}] [main/ERROR]: Incompatible mod set found! READ THE BELOW LINES!
+\tThese Fabric Mods are not whitelisted! You should delete these from Minecraft.
+\t\t[carpet]
+\tThese Fabric Mods are whitelisted but different version! Make sure to update these!
+\t\t[speedrunigt]
+\t\t[sodium]
+\tThese Fabric Mods are whitelisted and you seem to be using the correct version but the files do not match. Try downloading these files again!
+\t\t[lithium]
+\tat com.mcsr.projectelo.anticheat.file.verifiers.ModVerifier.verify(ModVerifier.java:52)
+"""
+
+def get_mods(amount: int) -> list[str]:
+    return [MODS[i] if i < len(MODS) else f"generated-mod-{i}-1.0.jar" for i in range(amount)]
+
+def get_header(launcher: str, loader: str, mods: list[str], version: str) -> str:
+    if launcher == "vanilla": return ""
+    if launcher == "multimc": mod_list = "".join(f"  [✔️] {mod}\n" for mod in mods)
+    else: mod_list = "".join(f"  [✔] {mod[:-4]}\n" for mod in mods)
+    name = "MultiMC" if launcher == "multimc" else "Prism Launcher"
+    return f"""{name} version: 1.0
+
+Launched instance in online mode
+
+Minecraft folder is:
+C:/Users/Steve/{name}/instances/{version}/.minecraft
+
+
+Checking Java version...
+Java is version 17.0.2, using 64 (amd64) architecture, from Oracle Corporation.
+
+
+Java Arguments:
+[-Xms512m, -Xmx2048m]
+
+
+Main Class:
+{MAIN_CLASSES[loader]}
+
+Libraries:
+  C:/Users/Steve/{name}/libraries/net/fabricmc/fabric-loader/0.14.21/fabric-loader-0.14.21.jar
+  C:/Users/Steve/{name}/libraries/org/lwjgl/lwjgl/3.2.2/lwjgl-3.2.2-natives-windows.jar
+
+Mods:
+{mod_list}
+Params:
+--username Steve --version {version} --gameDir C:/Users/Steve/{name}/instances/{version}/.minecraft
+
+"""
+
+def make_log(launcher: str="multimc", size: int=100_000, mods: int=10, crash: bool=False, anticheat: bool=False, version: str="1.16.1", loader: str="fabric", seed: int=0) -> str:
+    """
+    Builds a synthetic launcher log of roughly size characters, padded with game output.
+    Crash reports and the ranked anticheat block go at the end, where real logs have them.
+    """
+    r = random.Random(seed)
+    mod_names = get_mods(mods)
+    parts = [get_header(launcher, loader, mod_names, version)]
+    parts.append(BRAND_LINES[loader].format(time="12:00:00", version=version))
+    if launcher == "vanilla" and loader == "fabric":
+        parts.append(f"[12:00:00] [main/INFO]: Loading {len(mod_names)} mods:\n" + "".join(f"\t- {mod[:-4]}\n" for mod in mod_names))
+    ending = ""
+    if anticheat: ending += ANTICHEAT.format(time="12:59:59")
+    if crash: ending += CRASH_REPORT.format(version=version)
+    length = sum(len(part) for part in parts) + len(ending)
+    while length < size:
+        seconds = length % 3600
+        line = r.choice(LINES).format(time=f"12:{seconds // 60:02d}:{seconds % 60:02d}", seed=r.getrandbits(62), ms=r.randint(1, 2000)) + "\n"
+        parts.append(line)
+        length += len(line)
+    parts.append(ending)
+    return "".join(parts)
+
+def make_catalogue(mods: int=200, files: int=6, seed: int=0) -> list[dict]:
+    """Synthetic files.json in the format mods_getter downloads."""
+    r = random.Random(seed)
+    constraints = ["1.16.1", "1.16-", ">=1.15.2 <=1.16.5", "~1.16.1", ">1.14", "<1.17", "1.8.9", ">=1.16.2", "!=1.16.0", "==1.17.1"]
+    catalogue = []
+    for i in range(mods):
+        catalogue.append({
+            "modid": f"mod{i}",
+            "name": f"Mod {i}",
+            "description": "A mod.",
+            "type": "fabric_mod" if r.random() < 0.95 else "resourcepack",
+            "recommended": r.random() < 0.5,
+            "files": [{
+                "name": f"mod{i}-{j}.0.jar",
+                "version": f"{j}.0",
+                "game_versions": r.sample(constraints, r.randint(1, 3)),
+                "url": f"https://example.com/mod{i}-{j}.0.jar",
+                "sha1": f"{r.getrandbits(160):040x}",
+                "size": r.randint(1000, 1000000),
+                "page": f"https://example.com/mod{i}"
+            } for j in range(files)]
+        })
+    return catalogue
@@ -0,0 +1,79 @@
+"""
+Load test for the http service (serve.py).
+
+    python3 benchmarks/load_test.py --processes 1
+    python3 benchmarks/load_test.py --processes 4
+
+Starts serve.py with that many worker processes, or uses a running one with --url, and reports requests per second.
+"""
+import sys, os, time, asyncio, argparse, statistics, subprocess
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import aiohttp
+from benchmarks import generate
+
+async def wait_until_up(session: aiohttp.ClientSession, url: str):
+    for _ in range(100):
+        try:
+            async with session.get(f"{url}/health") as res:
+                if res.status == 200: return
+        except aiohttp.ClientError: pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("The server didn't start.")
+
+async def run(url: str, concurrency: int, duration: float, bodies: list[bytes], cached: bool) -> dict:
+    latencies = []
+    statuses = {}
+    end = time.perf_counter() + duration
+    # one connection per client, reused across requests
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=concurrency)) as session:
+        await wait_until_up(session, url)
+        async def client(index: int):
+            i = index
+            while time.perf_counter() < end:
+                start = time.perf_counter()
+                body = bodies[i % len(bodies)]
+                # a different last line makes every request miss the result cache
+                if not cached: body += f"[request {i}]\n".encode()
+                async with session.post(f"{url}/check", data=body, headers={"Content-Type": "text/plain"}) as res:
+                    await res.read()
+                    statuses[res.status] = statuses.get(res.status, 0) + 1
+                    if res.status == 200: latencies.append(time.perf_counter() - start)
+                    elif res.status == 429: await asyncio.sleep(float(res.headers.get("Retry-After", 1)) / 10)
+                i += concurrency
+        start = time.perf_counter()
+        await asyncio.gather(*[client(i) for i in range(concurrency)])
+        elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50": statistics.median(latencies) if latencies else None,
+        "p99": latencies[max(int(len(latencies) * 0.99) - 1, 0)] if latencies else None,
+        "statuses": statuses
+    }
+
+def main():
+    arguments = argparse.ArgumentParser(description="Load tests the http service.")
+    arguments.add_argument("--url", help="a running server, otherwise serve.py is started")
+    arguments.add_argument("--processes", type=int, default=1, help="worker processes of the started server")
+    arguments.add_argument("--port", type=int, default=8089)
+    arguments.add_argument("--concurrency", type=int, default=16)
+    arguments.add_argument("--duration", type=float, default=10)
+    arguments.add_argument("--size", type=float, default=0.1, help="log size in MB")
+    arguments.add_argument("--logs", type=int, default=50, help="different logs to send")
+    arguments.add_argument("--cached", action="store_true", help="send the same logs again, so most requests hit the result cache")
+    args = arguments.parse_args()
+
+    bodies = [generate.make_log(generate.LAUNCHERS[i % 3], int(args.size * 1e6), crash=i % 2 == 0, seed=i).encode() for i in range(args.logs)]
+    server = None
+    url = args.url
+    if url is None:
+        url = f"http://127.0.0.1:{args.port}"
+        server = subprocess.Popen([sys.executable, "serve.py", "--port", str(args.port), "--processes", str(args.processes)], stdout=subprocess.DEVNULL)
+    try: result = asyncio.run(run(url, args.concurrency, args.duration, bodies, args.cached))
+    finally:
+        if not server is None: server.terminate()
+    print(f"{result['rps']:.1f} requests/s, p50 {result['p50'] * 1000:.1f} ms, p99 {result['p99'] * 1000:.1f} ms, statuses {result['statuses']}")
+
+if __name__ == "__main__":
+    os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    main()
@@ -0,0 +1,115 @@
+"""
+Times parser.Log, IssueChecker.check, IssueBuilder.build and mods_getter on synthetic data.
+
+    python3 benchmarks/suite.py --output report.json
+    python3 benchmarks/suite.py --baseline report.json
+
+With --baseline, exits with status 1 if a case got slower or allocates more than the tolerance allows.
+"""
+import sys, os, json, time, copy, tracemalloc, argparse, platform, statistics
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cached_property import cached_property
+from BackgroundPingu.core import parser, issues, workers
+from BackgroundPingu.data import mods_getter
+from benchmarks import generate
+
+PROPERTIES = [name for name, value in vars(parser.Log).items() if isinstance(value, cached_property)]
+MIN_DELTA = 0.001
+
+def load_snapshot() -> workers.Snapshot:
+    with open("./BackgroundPingu/data/issues.json", "r") as f:
+        strings = json.load(f)
+    mods = []
+    if os.path.exists("./BackgroundPingu/data/mods.json"):
+        with open("./BackgroundPingu/data/mods.json", "r") as f:
+            mods = json.load(f)
+    return workers.Snapshot(strings, mods)
+
+def measure(function, repeat: int) -> dict:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    # separate run, tracing allocations slows everything down
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "best": min(times),
+        "median": statistics.median(times),
+        "peak": peak
+    }
+
+def add_result(results: dict, name: str, size: int, result: dict):
+    result["size"] = size
+    result["mb_per_s"] = size / 1e6 / result["best"] if result["best"] > 0 else None
+    results[name] = result
+    print(f"{name:<48} {result['best'] * 1000:>10.2f} ms {result['mb_per_s'] or 0:>10.1f} MB/s {result['peak'] / 1e6:>8.2f} MB peak")
+
+def run(args) -> dict:
+    snapshot = load_snapshot()
+    results = {}
+    for launcher in args.launchers:
+        for loader in args.loaders:
+            for size in args.sizes:
+                size = int(size * 1e6)
+                content = generate.make_log(launcher, size, args.mods, args.crash, args.anticheat, loader=loader)
+                case = f"{launcher}/{loader}/{size / 1e6:g}MB"
+                for name in PROPERTIES:
+                    add_result(results, f"log.{name}/{case}", len(content), measure(lambda: getattr(parser.Log(content), name), args.repeat))
+                add_result(results, f"check/{case}", len(content), measure(lambda: issues.IssueChecker(snapshot, parser.Log(content)).check(), args.repeat))
+                builder = issues.IssueChecker(snapshot, parser.Log(content)).check()
+                add_result(results, f"build/{case}", sum(len(message) for message in builder.build()), measure(builder.build, args.repeat))
+    catalogue = generate.make_catalogue(args.catalogue)
+    size = len(json.dumps(catalogue))
+    # process_mods edits the catalogue in place, so every run gets a fresh copy outside of the timed part
+    copies = [copy.deepcopy(catalogue) for _ in range(args.repeat + 1)]
+    add_result(results, f"mods_getter/{args.catalogue} mods", size, measure(lambda: mods_getter.process_mods(copies.pop()), args.repeat))
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results
+    }
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for name, result in report["results"].items():
+        old = baseline["results"].get(name)
+        if old is None: continue
+        if result["best"] > old["best"] * (1 + tolerance) and result["best"] - old["best"] > MIN_DELTA:
+            regressions.append(f"{name}: {old['best'] * 1000:.2f} ms -> {result['best'] * 1000:.2f} ms")
+        if result["peak"] > old["peak"] * (1 + tolerance) and result["peak"] - old["peak"] > 1e6:
+            regressions.append(f"{name}: {old['peak'] / 1e6:.2f} MB -> {result['peak'] / 1e6:.2f} MB peak")
+    return regressions
+
+def main():
+    arguments = argparse.ArgumentParser(description="Benchmarks log analysis on synthetic logs.")
+    arguments.add_argument("--sizes", type=float, nargs="+", default=[0.01, 0.1, 1, 10, 50], help="log sizes in MB")
+    arguments.add_argument("--launchers", nargs="+", default=generate.LAUNCHERS, choices=generate.LAUNCHERS)
+    arguments.add_argument("--loaders", nargs="+", default=["fabric"], choices=generate.LOADERS)
+    arguments.add_argument("--mods", type=int, default=20)
+    arguments.add_argument("--crash", action="store_true", help="end every log with a crash report")
+    arguments.add_argument("--anticheat", action="store_true", help="add a ranked anticheat block to every log")
+    arguments.add_argument("--catalogue", type=int, default=200, help="mods in the synthetic files.json")
+    arguments.add_argument("--repeat", type=int, default=3)
+    arguments.add_argument("--output", help="write the report as json")
+    arguments.add_argument("--baseline", help="compare against an earlier report")
+    arguments.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown, 0.25 is 25%%")
+    args = arguments.parse_args()
+
+    report = run(args)
+    if not args.output is None:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+    if not args.baseline is None:
+        with open(args.baseline, "r") as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for regression in regressions: print(f"REGRESSION {regression}")
+        if len(regressions) > 0: sys.exit(1)
+        print("No regressions.")
+
+if __name__ == "__main__":
+    os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    main()
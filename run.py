@@ -1,8 +1,9 @@
+import sys
+from BackgroundPingu.core import profiling
+# python run.py --profile-startup prints how long each module and cog took to load once the bot is ready
+if "--profile-startup" in sys.argv: profiling.start()
 from BackgroundPingu.bot import main
 from BackgroundPingu import secrets
-from BackgroundPingu.data import issues_sorter, mods_getter
 
 if __name__ == "__main__":
-    mods_getter.get_mods()
-    issues_sorter.sort()
     main.BackgroundPingu().run(secrets.Discord.TOKEN)
@@ -0,0 +1,4 @@
+from BackgroundPingu.core import server
+
+if __name__ == "__main__":
+    server.main()